@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+'''
+Memory and access speed of DIM arrays with millions of elements. Memory
+is the peak allocated by DIM and by filling every element, against the
+same values held in a list of Python ints. Access is elements written
+and read back per second by a BASIC loop, on each backend, and on the
+closure backend with list storage instead of array('q').
+
+    python bench/bench_arrays.py [elements]
+'''
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyTBasic.compiler import ClosureEvaluator
+from pyTBasic.evaluator import Evaluator
+from pyTBasic.interpreter import Interpreter
+from pyTBasic.transpiler import PythonEvaluator
+from pyTBasic.vm import VMEvaluator
+
+PROGRAM = '''\
+10 DIM A({last})
+20 LET I = 0
+30 LET A(I) = I * 3
+40 LET I = I + 1
+50 IF I <= {last} THEN GOTO 30
+60 LET S = 0
+70 LET I = 0
+80 LET S = S + A(I)
+90 LET I = I + 1
+100 IF I <= {last} THEN GOTO 80
+110 PRINT S
+'''
+
+
+class ListEvaluator(ClosureEvaluator):
+    'Closure evaluator keeping arrays in lists of Python ints'
+
+    def visit_Dim(self, node):
+        for element in node.operand:
+            self.arrays[element.left.value] = \
+                [0] * (self.visit(element.right) + 1)
+
+
+def peak(function):
+    'Peak memory allocated by function(), in bytes'
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def fill_array(n):
+    interpreter = Interpreter()
+    interpreter.execute('DIM A({})'.format(n - 1))
+    values = interpreter.evaluator.arrays['A']
+    for i in range(n):
+        values[i] = i * 3
+
+
+def fill_list(n):
+    values = [0] * n
+    for i in range(n):
+        values[i] = i * 3
+
+
+def access(evaluator_class, n):
+    'Elements written and read back per second'
+    interpreter = Interpreter(evaluator_class)
+    source = PROGRAM.format(last=n - 1)
+    start = time.perf_counter()
+    interpreter.run(source)
+    return 2 * n / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    print('memory, {} elements'.format(n))
+    for name, fill in (("array('q')", fill_array), ('list', fill_list)):
+        size = peak(lambda: fill(n))
+        print('  {:10} {:8.1f} MB {:6.1f} bytes/element'
+              .format(name, size / 2**20, size / n))
+    print('access, elements/s')
+    for evaluator_class in (Evaluator, ClosureEvaluator, PythonEvaluator,
+                            VMEvaluator, ListEvaluator):
+        print('  {:16} {:12,.0f}'.format(evaluator_class.__name__,
+                                         access(evaluator_class, n)))
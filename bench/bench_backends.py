@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+'''
+Time a hot arithmetic loop under each execution backend.
+
+    python bench/bench_backends.py [iterations]
+'''
+
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyTBasic import evaluator, parser
+from pyTBasic.compiler import ClosureEvaluator
+from pyTBasic.transpiler import PythonEvaluator
+from pyTBasic.vm import VMEvaluator
+
+PROGRAM = '''\
+10 LET I = 0
+20 LET S = 0
+30 LET S = S + I * 3 - I / 2
+40 LET I = I + 1
+50 IF I < {n} THEN GOTO 30
+60 PRINT S
+'''
+
+BACKENDS = [
+    ('tree', evaluator.Evaluator),
+    ('closure', ClosureEvaluator),
+    ('python', PythonEvaluator),
+    ('vm', VMEvaluator),
+]
+
+
+def bench(evaluator_class, n):
+    b_parser = parser.BasicParser()
+    b_evaluator = evaluator_class()
+    evaluator.line_num_table.clear()
+    for line in PROGRAM.format(n=n).splitlines():
+        b_evaluator.visit(b_parser.parse(line))
+    run = b_parser.parse('RUN')
+    with redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        b_evaluator.visit(run)
+        return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    base = None
+    for name, evaluator_class in BACKENDS:
+        elapsed = bench(evaluator_class, n)
+        base = base or elapsed
+        print('{:10} {:8.3f}s {:6.2f}x'.format(name, elapsed, base / elapsed))
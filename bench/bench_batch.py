@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+'''
+Programs per second of the batch runner with 1, 2, 4 ... worker
+processes, up to one per core, over copies of the benchmark corpus.
+
+    python bench/bench_batch.py [copies]
+'''
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyTBasic import batch
+
+CORPUS = os.path.join(os.path.dirname(__file__), 'corpus')
+
+
+def bench(paths, workers):
+    start = time.perf_counter()
+    for _ in batch.run_batch(paths, workers):
+        pass
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    with tempfile.TemporaryDirectory() as directory:
+        for i in range(copies):
+            for name in os.listdir(CORPUS):
+                shutil.copy(os.path.join(CORPUS, name),
+                            os.path.join(directory, '{}_{}'.format(i, name)))
+        paths = batch.find_programs(directory)
+        workers = 1
+        base = None
+        while workers <= (os.cpu_count() or 1):
+            elapsed = bench(paths, workers)
+            base = base or elapsed
+            print('{:3} workers {:8.1f} programs/s {:6.2f}x'
+                  .format(workers, len(paths) / elapsed, base / elapsed))
+            workers *= 2
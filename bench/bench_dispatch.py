@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+'''
+Time NodeVisitor dispatch against the old per-visit getattr lookup.
+
+    python bench/bench_dispatch.py [repeats]
+'''
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyTBasic import evaluator, parser
+
+
+class GetattrEvaluator(evaluator.Evaluator):
+    'Evaluator using the method lookup NodeVisitor did before caching'
+
+    def visit(self, node):
+        methname = 'visit_' + type(node).__name__
+        meth = getattr(self, methname, None)
+        if meth is None:
+            meth = self.generic_visit
+        return meth(node)
+
+
+EXPRESSION = 'IF ((A + 2) * (B - 3) / 4 + C * C) - (7 + 5) * 3 > A THEN LET D = 1'
+
+
+def bench(evaluator_class, repeats):
+    node = parser.BasicParser().parse(EXPRESSION)
+    visit = evaluator_class().visit
+    start = time.perf_counter()
+    for _ in range(repeats):
+        visit(node)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    before = bench(GetattrEvaluator, repeats)
+    after = bench(evaluator.Evaluator, repeats)
+    print('getattr  {:8.3f}s'.format(before))
+    print('cached   {:8.3f}s {:6.2f}x'.format(after, before / after))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+'''
+Time editing one line of a long loaded program: storing the line and
+bringing the evaluator up to date, as the next RUN does. Replacing,
+inserting and deleting a line in the middle are each timed, for the
+incremental closure evaluator and for the VM, which reassembles the
+whole program.
+
+    python bench/bench_edit.py [lines]
+'''
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyTBasic.compiler import ClosureEvaluator
+from pyTBasic.interpreter import Interpreter
+from pyTBasic.vm import VMEvaluator
+
+LINES = [
+    'LET A = A + {i} * (B - 3)',
+    'IF A > {i} THEN GOTO {target}',
+    'PRINT "LINE {i} ", A',
+    'GOSUB {target}',
+]
+
+
+def program(lines):
+    return ''.join('{} {}\n'.format(
+        10 * (i + 1),
+        LINES[i % len(LINES)].format(i=i, target=10 * (lines - i)))
+        for i in range(lines))
+
+
+def bench(evaluator_class, lines, repeat=200):
+    'Best time, in microseconds, of each kind of edit'
+    interpreter = Interpreter(evaluator_class)
+    interpreter.load(program(lines))
+    evaluator = interpreter.evaluator
+    evaluator.load()
+    middle = 10 * (lines // 2)
+    added = '{} LET C = 1'.format(middle + 5)
+    edits = [('replace', '{} LET B = B + 1'.format(middle)),
+             ('insert', added),
+             ('delete', '{}'.format(middle + 5))]
+    times = {}
+    for name, text in edits:
+        best = None
+        for _ in range(repeat if evaluator.incremental else 3):
+            if name == 'delete':
+                interpreter.execute(added)
+                evaluator.load()
+            line = interpreter.parser.parse(text)
+            start = time.perf_counter()
+            evaluator.visit(line)
+            evaluator.load()
+            elapsed = time.perf_counter() - start
+            if name == 'insert':
+                del interpreter.program[middle + 5]
+                evaluator.load()
+            best = elapsed if best is None else min(best, elapsed)
+        times[name] = best * 1e6
+    return times
+
+
+if __name__ == '__main__':
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    print('{} line program, microseconds per edit'.format(lines))
+    for evaluator_class in (ClosureEvaluator, VMEvaluator):
+        times = bench(evaluator_class, lines)
+        print('  {:16} '.format(evaluator_class.__name__) +
+              '  '.join('{} {:10.1f}'.format(name, t)
+                        for name, t in times.items()))
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+'''
+Time a counting loop on the tree walker with and without the tracing
+JIT, next to the other backends.
+
+    python bench/bench_jit.py [iterations]
+'''
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyTBasic.compiler import ClosureEvaluator
+from pyTBasic.evaluator import Evaluator
+from pyTBasic.interpreter import Interpreter
+from pyTBasic.jit import JITEvaluator
+from pyTBasic.transpiler import PythonEvaluator
+from pyTBasic.vm import VMEvaluator
+
+PROGRAM = '''\
+10 LET I = 0
+20 LET S = 0
+30 LET S = S + I
+40 LET I = I + 1
+50 IF I < {n} THEN GOTO 30
+60 PRINT S
+'''
+
+BACKENDS = [
+    ('tree', Evaluator),
+    ('jit', JITEvaluator),
+    ('closure', ClosureEvaluator),
+    ('python', PythonEvaluator),
+    ('vm', VMEvaluator),
+]
+
+
+def bench(evaluator_class, n):
+    interpreter = Interpreter(evaluator_class)
+    source = PROGRAM.format(n=n)
+    start = time.perf_counter()
+    interpreter.run(source)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    base = None
+    for name, evaluator_class in BACKENDS:
+        elapsed = bench(evaluator_class, n)
+        base = base or elapsed
+        print('{:10} {:8.3f}s {:7.2f}x'.format(name, elapsed, base / elapsed))
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+'''
+Time a PRINT heavy program writing through each flush policy of
+output.FileSink, against print() per line, to a block buffered file and
+to a line buffered one (as sys.stdout is on a terminal).
+
+    python bench/bench_output.py [lines]
+'''
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyTBasic import output
+from pyTBasic.interpreter import Interpreter
+
+PROGRAM = '''\
+10 LET I = 0
+20 PRINT "LINE ", I, " OF THE REPORT, VALUE ", I * I
+30 LET I = I + 1
+40 IF I < {n} THEN GOTO 20
+'''
+
+
+class PrintSink(output.FileSink):
+    'One print() call per line, as PRINT used to do'
+
+    def write_line(self, text):
+        print(text, file=self.file)
+
+
+def bench(sink, n):
+    interpreter = Interpreter(output=sink)
+    interpreter.load(PROGRAM.format(n=n))
+    start = time.perf_counter()
+    interpreter.execute('RUN')
+    sink.file.flush()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    for name, buffering in (('block buffered', -1), ('line buffered', 1)):
+        with tempfile.TemporaryFile('w', buffering=buffering) as f:
+            print(name)
+            base = bench(PrintSink(f), n)
+            print('  print() {:8.3f}s'.format(base))
+            for policy in output.POLICIES:
+                elapsed = bench(output.FileSink(f, policy), n)
+                print('  {:7} {:8.3f}s {:6.2f}x'.format(policy, elapsed,
+                                                        base / elapsed))
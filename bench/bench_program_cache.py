@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+'''
+Compare parsing a program file with loading its precompiled .basc.
+
+    python bench/bench_program_cache.py [lines]
+'''
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyTBasic import loader
+
+
+def write_program(path, lines):
+    with open(path, 'w') as f:
+        for i in range(lines):
+            number = 10 * (i + 1)
+            if i % 3:
+                f.write('{} LET A = A + {} * (B - 3)\n'.format(number, i % 7))
+            else:
+                f.write('{} IF A > {} THEN PRINT "A IS ", A\n'.format(number, i))
+
+
+def timed(path, **kwargs):
+    start = time.perf_counter()
+    loader.read_program(path, **kwargs)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'program.bas')
+        write_program(path, lines)
+        cold = timed(path, cache=False)
+        timed(path)                 # Write the .basc
+        cached = timed(path)
+        size = os.path.getsize(path + loader.CACHE_SUFFIX)
+    print('{} lines'.format(lines))
+    print('cold parse   {:8.3f}s'.format(cold))
+    print('cached load  {:8.3f}s {:6.1f}x  ({} byte .basc)'
+          .format(cached, cold / cached, size))
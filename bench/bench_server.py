@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+'''
+Run the same INPUT/PRINT program in many concurrent sessions of one
+server process over loopback, and report how long they took together.
+
+    python bench/bench_server.py [sessions]
+'''
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyTBasic import server
+
+PROGRAM = [
+    '10 INPUT N',
+    '20 LET S = 0',
+    '30 LET I = 1',
+    '40 LET S = S + I',
+    '50 LET I = I + 1',
+    '60 IF I <= N THEN GOTO 40',
+    '70 PRINT S',
+]
+
+
+async def session(port, n):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    prompt = server.PROMPT.encode()
+    await reader.readuntil(prompt)
+    for line in PROGRAM:
+        writer.write(line.encode() + b'\n')
+        await reader.readuntil(prompt)
+    writer.write(b'RUN\n')
+    await reader.readuntil(server.INPUT_PROMPT.encode())
+    writer.write(str(n).encode() + b'\n')
+    output = await reader.readuntil(prompt)
+    writer.close()
+    await writer.wait_closed()
+    assert output.decode() == '{}\n] '.format(n * (n + 1) // 2), output
+
+
+async def main(sessions):
+    srv = await server.start_server(port=0)
+    port = srv.sockets[0].getsockname()[1]
+    start = time.perf_counter()
+    await asyncio.gather(*[session(port, 1000 + i) for i in range(sessions)])
+    elapsed = time.perf_counter() - start
+    srv.close()
+    await srv.wait_closed()
+    print('{} sessions {:8.3f}s {:8.1f} sessions/s'
+          .format(sessions, elapsed, sessions / elapsed))
+
+
+if __name__ == '__main__':
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 300))
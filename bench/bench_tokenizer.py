@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+'''
+Tokens per second of the master_pat tokenizer and the hand written
+scanner, as Token streams and as TokenArrays, over a generated
+program, then lines per second parsed from each kind of TokenArrays.
+
+    python bench/bench_tokenizer.py [lines]
+'''
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyTBasic.parser import (BasicParser, TokenArrays, compact_tokens,
+                             generate_tokens)
+from pyTBasic.scanner import scan_arrays, scan_tokens
+
+LINES = [
+    '{} LET A = A + {} * (B - 3)',
+    '{} IF A >= {} THEN PRINT "A IS ", A, " AND B IS ", B',
+    '{} GOSUB 1000',
+    '{} IF I <> 10 THEN GOTO {}',
+]
+
+
+def program(lines):
+    return '\n'.join(LINES[i % len(LINES)].format(10 * (i + 1), i)
+                     for i in range(lines))
+
+
+def bench(tokenizer, text):
+    start = time.perf_counter()
+    tokens = tokenizer(text)
+    if isinstance(tokens, TokenArrays):
+        count = len(tokens)
+    else:
+        count = sum(1 for _ in tokens)
+    return count, time.perf_counter() - start
+
+
+def bench_parse(tokenizer, text):
+    b_parser = BasicParser(tokenizer=tokenizer)
+    start = time.perf_counter()
+    count = sum(1 for _ in b_parser.parse_program(text))
+    return count, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    text = program(lines)
+    base = None
+    for name, tokenizer in (('master_pat', generate_tokens),
+                            ('scanner', scan_tokens),
+                            ('master_pat arrays', compact_tokens),
+                            ('scanner arrays', scan_arrays)):
+        count, elapsed = bench(tokenizer, text)
+        base = base or elapsed
+        print('{:18} {:10.0f} tokens/s {:6.2f}x'
+              .format(name, count / elapsed, base / elapsed))
+    base = None
+    for name, tokenizer in (('parse master_pat', compact_tokens),
+                            ('parse scanner', scan_arrays)):
+        count, elapsed = bench_parse(tokenizer, text)
+        base = base or elapsed
+        print('{:18} {:10.0f} lines/s  {:6.2f}x'
+              .format(name, count / elapsed, base / elapsed))
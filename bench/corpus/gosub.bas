@@ -0,0 +1,16 @@
+10 LET I = 0
+20 LET C = 0
+30 GOSUB 100
+40 GOSUB 200
+50 LET I = I + 1
+60 IF I < 5000 THEN GOTO 30
+70 PRINT C
+80 END
+100 LET C = C + 1
+110 GOSUB 300
+120 RETURN
+200 LET C = C + 2
+210 IF C / 2 * 2 = C THEN GOSUB 300
+220 RETURN
+300 LET D = C * 3
+310 RETURN
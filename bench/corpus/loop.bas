@@ -0,0 +1,8 @@
+10 LET I = 0
+20 LET S = 0
+30 LET S = S + I * 3 - I / 2
+40 LET T = (S - I) / 7 + I * I
+50 LET I = I + 1
+60 IF I < 20000 THEN GOTO 30
+70 PRINT S, " ", T
+80 END
@@ -0,0 +1,7 @@
+10 LET I = 0
+20 PRINT "LINE ", I, " OF THE REPORT"
+30 PRINT "  VALUE ", I * I, " HALF ", I / 2
+40 PRINT
+50 LET I = I + 1
+60 IF I < 3000 THEN GOTO 20
+70 END
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+'''
+Benchmark suite over the programs in bench/corpus plus a generated very
+long program. For each program it measures separately:
+
+  tokens_per_s      generate_tokens throughput
+  lines_per_s       BasicParser.parse throughput, one line at a time
+  statements_per_s  Evaluator statements executed per second by RUN
+  peak_kb           peak memory allocated while parsing and running
+
+Results are written as JSON and compared against a stored baseline, so
+a change shows up as a percentage per metric. Timings are the best of
+--repeat batches of calls.
+
+    python bench/suite.py [--output results.json] [--baseline FILE]
+                          [--save-baseline] [--threshold PERCENT]
+'''
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import timeit
+import tracemalloc
+from contextlib import redirect_stdout
+from functools import partial
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pyTBasic import evaluator, parser
+from pyTBasic.basic_types import Run
+
+CORPUS = os.path.join(os.path.dirname(__file__), 'corpus')
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Metric -> True if a larger value is better
+METRICS = {
+    'tokens_per_s': True,
+    'lines_per_s': True,
+    'statements_per_s': True,
+    'peak_kb': False,
+}
+
+LONG_LINES = [
+    'LET A = A + {i} * (B - 3)',
+    'IF A > {i} THEN LET B = B + 1',
+    'PRINT "LINE {i} ", A, " ", B',
+    'LET B = B - A / 7',
+]
+
+
+def long_program(lines=5000):
+    'A very long straight line program'
+    text = ['{} {}'.format(10 * (i + 1),
+                           LONG_LINES[i % len(LONG_LINES)].format(i=i))
+            for i in range(lines)]
+    text.append('{} END'.format(10 * (lines + 1)))
+    return '\n'.join(text) + '\n'
+
+
+def corpus():
+    'Name -> source text of every benchmark program'
+    programs = {}
+    for name in sorted(os.listdir(CORPUS)):
+        if name.endswith('.bas'):
+            with open(os.path.join(CORPUS, name)) as f:
+                programs[name[:-4]] = f.read()
+    programs['long'] = long_program()
+    return programs
+
+
+class CountingEvaluator(evaluator.Evaluator):
+    'Evaluator counting the statements it executes'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.steps = 0
+
+    def compile_line(self, statement):
+        visit = super().compile_line(statement)
+
+        def step():
+            self.steps += 1
+            visit()
+        return step
+
+
+def tokenize(text):
+    for _ in parser.generate_tokens(text):
+        pass
+
+
+def parse_lines(lines):
+    b_parser = parser.BasicParser()
+    return [b_parser.parse(line) for line in lines]
+
+
+def run(evaluator_class, parsed):
+    'Load parsed lines into a fresh store and RUN them'
+    evaluator.line_num_table.clear()
+    for name in evaluator.symbol_table:
+        evaluator.symbol_table[name] = 0
+    b_evaluator = evaluator_class()
+    for line in parsed:
+        b_evaluator.visit(line)
+    with redirect_stdout(io.StringIO()):
+        b_evaluator.visit(Run(None))
+    return b_evaluator
+
+
+def best(repeat, function, *args):
+    '''
+    Best wall time of one call, out of repeat batches of calls that
+    each take at least 0.2 seconds
+    '''
+    timer = timeit.Timer(partial(function, *args))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def measure(text, repeat):
+    lines = [line for line in text.splitlines() if line.strip()]
+    tokens = sum(1 for _ in parser.generate_tokens(text))
+    parsed = parse_lines(lines)
+    steps = run(CountingEvaluator, parsed).steps
+
+    tracemalloc.start()
+    run(evaluator.Evaluator, parse_lines(lines))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'tokens_per_s': tokens / best(repeat, tokenize, text),
+        'lines_per_s': len(lines) / best(repeat, parse_lines, lines),
+        'statements_per_s':
+            steps / best(repeat, run, evaluator.Evaluator, parsed),
+        'peak_kb': peak / 1024,
+    }
+
+
+def compare(results, baseline, threshold):
+    '''
+    Print every metric with its change from baseline. Returns the
+    number of metrics that got worse by more than threshold percent.
+    '''
+    regressions = 0
+    for name, metrics in results['programs'].items():
+        old = baseline.get('programs', {}).get(name, {})
+        for metric, higher_is_better in METRICS.items():
+            value = metrics[metric]
+            if not old.get(metric):
+                print('{:8} {:18} {:14.1f}'.format(name, metric, value))
+                continue
+            change = (value - old[metric]) / old[metric] * 100
+            worse = -change if higher_is_better else change
+            flag = ''
+            if worse > threshold:
+                flag = '  REGRESSION'
+                regressions += 1
+            print('{:8} {:18} {:14.1f} {:+8.1f}%{}'
+                  .format(name, metric, value, change, flag))
+    return regressions
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    arg_parser.add_argument('--output', help='write the results to this '
+                                             'JSON file')
+    arg_parser.add_argument('--baseline', default=BASELINE,
+                            help='JSON results to compare against')
+    arg_parser.add_argument('--save-baseline', action='store_true',
+                            help='store the results as the new baseline')
+    arg_parser.add_argument('--threshold', type=float, default=10.0,
+                            help='percent a metric may get worse before it '
+                                 'counts as a regression')
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args(argv)
+
+    results = {
+        'python': platform.python_version(),
+        'programs': {name: measure(text, args.repeat)
+                     for name, text in corpus().items()},
+    }
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        return 0
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,25 +1,175 @@
 #!/usr/bin/env python3
 
+import argparse
+import asyncio
+import json
+import sys
+from pyTBasic import batch
 from pyTBasic import parser
 from pyTBasic import evaluator
+from pyTBasic import compiler
+from pyTBasic import jit
+from pyTBasic import loader
+from pyTBasic import optimizer
+from pyTBasic import output
+from pyTBasic import profiler
+from pyTBasic import scanner
+from pyTBasic import server
+from pyTBasic import transpiler
+from pyTBasic import vm
+from pyTBasic.basic_types import Run
 
+BACKENDS = {
+    'tree': evaluator.Evaluator,
+    'closure': compiler.ClosureEvaluator,
+    'python': transpiler.PythonEvaluator,
+    'vm': vm.VMEvaluator,
+    'jit': jit.JITEvaluator,
+}
 
 if __name__ == '__main__':
-    b_parser = parser.BasicParser()
-    b_evaluator = evaluator.Evaluator()
+    arg_parser = argparse.ArgumentParser(description='Tiny BASIC')
+    arg_parser.add_argument('program', nargs='?',
+                            help='.bas file to load and run instead of '
+                                 'starting the prompt')
+    arg_parser.add_argument('-O', '--optimize', action='store_true',
+                            help='fold constants in lines before running them '
+                                 'and report the rewrites')
+    arg_parser.add_argument('--no-cache', action='store_true',
+                            help='do not read or write the precompiled '
+                                 '.basc file next to the program')
+    arg_parser.add_argument('--cache-size', type=int, default=1024,
+                            help='number of parsed lines to keep cached')
+    arg_parser.add_argument('--unreachable', action='store_true',
+                            help='report the lines of the program no RUN '
+                                 'can reach before running it')
+    arg_parser.add_argument('--profile', action='store_true',
+                            help='report the hottest lines after every RUN')
+    arg_parser.add_argument('--max-steps', type=int,
+                            help='stop a run after this many statements')
+    arg_parser.add_argument('--max-time', type=float,
+                            help='stop a run after this many seconds')
+    arg_parser.add_argument('--max-int-bits', type=int,
+                            help='largest value a variable may hold, in bits')
+    arg_parser.add_argument('--max-string', type=int,
+                            help='longest string a PRINT may hold')
+    arg_parser.add_argument('--max-elements', type=int,
+                            help='most elements all DIMmed arrays may hold')
+    arg_parser.add_argument('--no-bounds-check', action='store_true',
+                            help='let negative array subscripts count from '
+                                 'the end of the array')
+    arg_parser.add_argument('--batch', metavar='DIR',
+                            help='run every .bas file in DIR and print one '
+                                 'JSON record per program')
+    arg_parser.add_argument('--workers', type=int,
+                            help='worker processes for --batch (default: '
+                                 'one per core)')
+    arg_parser.add_argument('--serve', type=int, metavar='PORT',
+                            help='serve an interpreter session to every TCP '
+                                 'connection on PORT')
+    arg_parser.add_argument('--host', default='127.0.0.1',
+                            help='address to --serve on')
+    arg_parser.add_argument('--slice', type=int, default=1000,
+                            help='statements a --serve session runs before '
+                                 'letting the others run')
+    arg_parser.add_argument('--flush', choices=output.POLICIES,
+                            help='when PRINT output is written: after every '
+                                 'line, in batches by size, or at the end of '
+                                 'a run (default: line at the prompt, size '
+                                 'when running a program)')
+    arg_parser.add_argument('--backend', choices=BACKENDS, default='closure',
+                            help='how statements run: walking the parse '
+                                 'tree, as closures, transpiled to Python, '
+                                 'on the bytecode VM or with hot loops '
+                                 'traced')
+    arg_parser.add_argument('--tokenizer', choices=['regex', 'scanner'],
+                            default='scanner',
+                            help='master_pat regex or hand written scanner')
+    args = arg_parser.parse_args()
+
+    tokenizer = {'regex': parser.compact_tokens,
+                 'scanner': scanner.scan_arrays}[args.tokenizer]
+    evaluator_class = BACKENDS[args.backend]
+    b_parser = parser.BasicParser(parser.ParseCache(args.cache_size),
+                                  tokenizer)
+    limits = evaluator.Limits(args.max_steps, args.max_time,
+                              args.max_int_bits, args.max_string,
+                              args.max_elements)
+    if all(limit is None for limit in vars(limits).values()):
+        limits = None
+
+    if args.batch is not None:
+        for record in batch.run_batch(batch.find_programs(args.batch),
+                                      args.workers, evaluator_class,
+                                      limits):
+            print(json.dumps(record))
+        sys.exit(0)
+
+    if args.serve is not None:
+        try:
+            asyncio.run(server.serve(args.host, args.serve, evaluator_class,
+                                     limits=limits, slice_steps=args.slice))
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    policy = args.flush
+    if policy is None:
+        policy = output.LINE if args.program is None else output.SIZE
+    b_evaluator = evaluator_class(
+        limits=limits, output=output.FileSink(policy=policy),
+        check_bounds=not args.no_bounds_check)
+    if args.profile:
+        b_evaluator.profiler = profiler.LineProfiler()
     b_print_tree = evaluator.PrintParseTree()
+    b_optimizer = optimizer.Optimizer() if args.optimize else None
+
+    if args.program is not None:
+        program = evaluator.line_num_table
+        try:
+            loader.load_program(args.program, program, b_parser,
+                                not args.no_cache)
+            if b_optimizer is not None:
+                for number in program.numbers():
+                    program[number] = b_optimizer.optimize(program[number])
+                    for change in b_optimizer.changes:
+                        print("OPTIMIZED ", change)
+            if args.unreachable:
+                for number in b_evaluator.control_flow().unreachable_lines():
+                    print("UNREACHABLE ", number)
+            b_evaluator.visit(Run(None))
+        except evaluator.QuitRequested:
+            pass
+        except SyntaxError as e:
+            print("SYNTAX ERROR ", e)
+            sys.exit(1)
+        except evaluator.BasicRuntimeError as e:
+            print("RUNTIME ERROR ", e)
+            sys.exit(1)
+        except (OSError, UnicodeDecodeError) as e:
+            # Missing, unreadable or not UTF-8
+            print("LOAD ERROR ", e)
+            sys.exit(1)
+        sys.exit(0)
+
     _input = ''
     while _input != 'exit()':
         _input = input("] ")
         try:
             # parsed = b_parser.parse(_input.upper())
             # representation = b_print_tree.visit(parsed)
-            result = b_evaluator.visit(
-                b_parser.parse(
-                    _input.upper()
-                )
-            )
+            parsed = b_parser.parse(_input.upper())
+            if b_optimizer is not None:
+                parsed = b_optimizer.optimize(parsed)
+                for change in b_optimizer.changes:
+                    print("OPTIMIZED ", change)
+            result = b_evaluator.visit(parsed)
+            b_evaluator.output.flush()
+        except evaluator.QuitRequested:
+            break
         except SyntaxError as e:
             print("SYNTAX ERROR ", e)
+        except evaluator.BasicRuntimeError as e:
+            print("RUNTIME ERROR ", e)
         else:
             continue
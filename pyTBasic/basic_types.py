@@ -1,36 +1,107 @@
 #!/usr/bin/env python3
 
+from operator import attrgetter
+
+# The variables A to Z live in slots 0 to 25
+NAMES = tuple(chr(i) for i in range(65, 91))
+SLOTS = {name: slot for slot, name in enumerate(NAMES)}
+
+
+def listed(operand):
+    'Tuple operands are shown as the lists they are built from'
+    return list(operand) if isinstance(operand, tuple) else operand
+
 
 class Node:
-    __slots__ = ()
+    '''
+    Nodes are immutable and compare and hash by their fields, the slots
+    of their class and its bases not starting with _. The hash is worked
+    out when first asked for and kept.
+    '''
+    __slots__ = ('_hash',)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = []
+        for base in reversed(cls.__mro__):
+            slots = base.__dict__.get('__slots__', ())
+            fields.extend(slot for slot in slots if not slot.startswith('_'))
+        cls._fields = tuple(fields)
+        # Slots are set through their descriptors, as setting an
+        # attribute of a node is an error
+        cls._setters = tuple(getattr(cls, name).__set__ for name in fields)
+        if fields:
+            cls._values = attrgetter(*fields)
+
+    def _key(self):
+        '''
+        What the node compares and hashes by besides its class: the
+        value of its field, or a tuple of them if it has several
+        '''
+        return self._values(self)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('{} nodes are immutable'
+                             .format(type(self).__name__))
+
+    def __delattr__(self, name):
+        self.__setattr__(name, None)
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, Node):
+            return NotImplemented
+        return type(self) is type(other) and self._key() == other._key()
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            node_hash = hash((type(self), self._key()))
+            _set_hash(self, node_hash)
+            return node_hash
 
     def __repr__(self):
         return ''.join([str(type(self).__name__), '(', str(self.value), ')'])
 
-    # def __eq__(self, other):
-    #       return self.__dict__ == other.__dict__ \
-    #            and type(self).__name__ == type(other).__name__
+
+_new = object.__new__
+_set_hash = Node._hash.__set__
 
 
+# A list operand is stored as a tuple
 class UnaryOperator(Node):
     __slots__ = ['operand']
 
-    def __init__(self, operand):
-        self.operand = operand
+    def __new__(cls, operand):
+        if isinstance(operand, list):
+            operand = tuple(operand)
+        node = _new(cls)
+        _set_operand(node, operand)
+        return node
 
     def __repr__(self):
-        return ''.join([str(type(self).__name__), '(', str(self.operand), ')'])
+        return ''.join([str(type(self).__name__), '(',
+                        str(listed(self.operand)), ')'])
 
     def __str__(self):
-        return ''.join([str(type(self).__name__), ' ', str(self.operand)])
+        return ''.join([str(type(self).__name__), ' ',
+                        str(listed(self.operand))])
 
 
+_set_operand = UnaryOperator.operand.__set__
+
+
+# Both operands are nodes
 class BinaryOperator(Node):
     __slots__ = ['left', 'right']
 
-    def __init__(self, left, right):
-        self.left = left
-        self.right = right
+    def __new__(cls, left, right):
+        node = _new(cls)
+        _set_left(node, left)
+        _set_right(node, right)
+        return node
 
     def __repr__(self):
         return ''.join([str(type(self).__name__),
@@ -42,10 +113,15 @@ class BinaryOperator(Node):
                         ])
 
 
+_set_left = BinaryOperator.left.__set__
+_set_right = BinaryOperator.right.__set__
+
+
 class Relop(BinaryOperator):
     __slots__ = ()
 
 
+# right is None for a line being deleted
 class LineNum(BinaryOperator):
     __slots__ = ()
 
@@ -70,6 +146,16 @@ class Div(BinaryOperator):
     __slots__ = ()
 
 
+class Neg(UnaryOperator):
+    __slots__ = ()
+
+    def __repr__(self):
+        return ''.join(['Neg(', repr(self.operand), ')'])
+
+    def __str__(self):
+        return '-' + str(self.operand)
+
+
 # Relative Operators
 class Equal(Relop):
     __slots__ = ()
@@ -102,37 +188,65 @@ class Assign(BinaryOperator):
     __slots__ = ()
 
 
-# Terminals
+# Terminals. 1, 1.0 and True are equal but print differently, so the
+# type of the value is part of the key.
 class Num(Node):
     __slots__ = ['value']
 
-    def __init__(self, value):
-        self.value = value
+    def __new__(cls, value):
+        node = _new(cls)
+        cls._setters[0](node, value)
+        return node
+
+    def _key(self):
+        return self.value, type(self.value)
 
     def __str__(self):
         return str(self.value)
 
 
+# value is the name of the variable, slot its index in the variable store
 class Var(Node):
-    __slots__ = ['value']
+    __slots__ = ['value', 'slot']
 
-    def __init__(self, value):
-        self.value = value
+    def __new__(cls, value, slot=None):
+        if slot is None:
+            slot = SLOTS.get(value)
+        node = _new(cls)
+        _set_name(node, value)
+        _set_slot(node, slot)
+        return node
 
     def __str__(self):
         return str(self.value)
 
 
+_set_name = Var.value.__set__
+_set_slot = Var.slot.__set__
+
+# The Var of every variable, made once for all the parsed programs
+VARIABLES = {name: Var(name, slot) for name, slot in SLOTS.items()}
+
+
 class String(Node):
     __slots__ = ['value']
 
-    def __init__(self, value):
-        self.value = value
+    __new__ = Num.__new__
+    _key = Num._key
 
     def __str__(self):
         return str(self.value)
 
 
+# Element of an array: left is the String name of the array, right the
+# subscript expression.
+class Index(BinaryOperator):
+    __slots__ = ()
+
+    def __str__(self):
+        return ''.join([str(self.left), '(', str(self.right), ')'])
+
+
 # Keywords
 class Print(UnaryOperator):
     __slots__ = ()
@@ -164,6 +278,15 @@ class Let(BinaryOperator):
         return ''.join(['LET ', str(self.left), ' = ', str(self.right)])
 
 
+# The operand is a list of Index nodes, one per array, whose subscripts
+# are the largest subscripts of the arrays.
+class Dim(UnaryOperator):
+    __slots__ = ()
+
+    def __str__(self):
+        return 'DIM ' + ', '.join([str(i) for i in self.operand])
+
+
 class Gosub(UnaryOperator):
     __slots__ = ()
 
@@ -184,5 +307,22 @@ class Run(UnaryOperator):
     __slots__ = ()
 
 
+class Profile(UnaryOperator):
+    __slots__ = ()
+
+
 class End(UnaryOperator):
     __slots__ = ()
+
+
+class Quit(UnaryOperator):
+    __slots__ = ()
+
+
+# Produced by the optimizer in place of a statement that never runs.
+# The operand is the statement it replaced.
+class Nop(UnaryOperator):
+    __slots__ = ()
+
+    def __str__(self):
+        return str(self.operand)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pyTBasic.compiler import ClosureEvaluator
+from pyTBasic.evaluator import BasicRuntimeError, Limits, QuitRequested
+from pyTBasic.interpreter import Interpreter
+from pyTBasic.output import BufferSink
+
+# Limits of a run not given them: batch programs are untrusted, and a
+# runaway one must end in an error record, not take a worker down
+MAX_TIME = 10.0         # Seconds, if not given a time or step limit
+MAX_INT_BITS = 65536    # Bits in a value stored in a variable
+MAX_ELEMENTS = 1000000  # Elements in all arrays
+
+
+def run_file(path, evaluator_class=ClosureEvaluator, limits=None):
+    '''
+    Parse the program in path once and RUN it in an Interpreter of its
+    own, within limits filled in by batch_limits(). Returns a record of
+    the run:
+
+      program   path
+      stdout    everything the program printed
+      status    0 on success, 1 on any error
+      error     the error message, or None
+      steps     statements executed
+      elapsed   seconds spent parsing and running
+    '''
+    start = time.perf_counter()
+    output = BufferSink()
+    limits = batch_limits(limits)
+    interpreter = Interpreter(evaluator_class, limits=limits,
+                              output=output, input=iter(()))
+    status, error = 0, None
+    try:
+        with open(path) as f:
+            interpreter.load(f.read(), path)
+        interpreter.execute('RUN')
+    except QuitRequested:
+        pass                        # QUIT ends the program as END does
+    except SyntaxError as e:
+        status, error = 1, 'SYNTAX ERROR {}'.format(e)
+    except BasicRuntimeError as e:
+        status, error = 1, 'RUNTIME ERROR {}'.format(e)
+    except OSError as e:
+        status, error = 1, str(e)
+    except Exception as e:
+        # Anything else is a bug, but must not take the batch down
+        status, error = 1, 'ERROR {}: {}'.format(type(e).__name__, e)
+    return {
+        'program': path,
+        'stdout': output.getvalue(),
+        'status': status,
+        'error': error,
+        'steps': interpreter.evaluator.steps,
+        'elapsed': time.perf_counter() - start,
+    }
+
+
+def batch_limits(limits=None):
+    '''
+    Copy of limits with the batch defaults in place of the limits left
+    as None: MAX_TIME if neither steps nor time are limited, and
+    MAX_INT_BITS and MAX_ELEMENTS.
+    '''
+    values = vars(limits or Limits()).copy()
+    if values['max_steps'] is None and values['max_time'] is None:
+        values['max_time'] = MAX_TIME
+    for name, default in (('max_int_bits', MAX_INT_BITS),
+                          ('max_elements', MAX_ELEMENTS)):
+        if values[name] is None:
+            values[name] = default
+    return Limits(**values)
+
+
+def find_programs(directory):
+    'Paths of the .bas files in directory, sorted'
+    return [os.path.join(directory, name)
+            for name in sorted(os.listdir(directory))
+            if name.endswith('.bas')]
+
+
+def run_batch(paths, workers=None, evaluator_class=ClosureEvaluator,
+              limits=None):
+    '''
+    Run every program in paths across a pool of worker processes,
+    yielding the record of each run in the order of paths. Programs
+    are handed out in chunks, so each worker gets several per round
+    trip.
+    '''
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (workers * 4))
+    run = partial(run_file, evaluator_class=evaluator_class, limits=limits)
+    with ProcessPoolExecutor(workers) as executor:
+        yield from executor.map(run, paths, chunksize=chunksize)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+from pyTBasic.basic_types import End, Goto, Gosub, If, Num, Quit, Return
+
+''' Control flow of a loaded program.
+
+A basic block is a run of lines that is only entered at its first line
+and only left after its last one. Blocks start at line 0, at the target
+of every constant GOTO and GOSUB, and after every line that can jump:
+GOTO, GOSUB, RETURN, END and QUIT, alone or as the THEN of an IF.
+'''
+
+
+def control(statement):
+    'The statement deciding where control goes after statement'
+    while isinstance(statement, If):
+        statement = statement.right
+    return statement
+
+
+def ends_block(statement):
+    'Can control leave statement other than by falling through?'
+    return isinstance(control(statement),
+                      (Goto, Gosub, Return, End, Quit))
+
+
+def constant_target(statement):
+    'Line number a statement can jump to, if it is a constant'
+    node = control(statement)
+    if isinstance(node, (Goto, Gosub)) and isinstance(node.operand, Num):
+        return node.operand.value
+    return None
+
+
+class Block:
+    '''
+    Lines start to end - 1 of the loaded program, and the indexes of
+    the blocks control can go to after them
+    '''
+    __slots__ = ['start', 'end', 'successors']
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        self.successors = []
+
+    def __repr__(self):
+        return 'Block({}, {}, {})'.format(self.start, self.end,
+                                         self.successors)
+
+
+class ControlFlowGraph:
+    '''
+    Basic blocks of the program loaded in an evaluator, with an edge
+    from each block to every block control can go to next. A GOSUB has
+    edges to its target and to the line after it, where its RETURN
+    comes back to; RETURN and END have none. A computed GOTO or GOSUB
+    can go to any block.
+    '''
+
+    def __init__(self, evaluator):
+        statements = evaluator.statements
+        self.line_numbers = evaluator.line_numbers
+        starts = {0}
+        for pc, statement in enumerate(statements):
+            if ends_block(statement):
+                starts.add(pc + 1)
+            node = control(statement)
+            if isinstance(node, (Goto, Gosub)):
+                target = evaluator.target_position(node)
+                if target is not None:
+                    starts.add(target)
+        starts = sorted(start for start in starts if start < len(statements))
+        self.blocks = [Block(start, end) for start, end
+                       in zip(starts, starts[1:] + [len(statements)])]
+        self.block_index = {block.start: i
+                            for i, block in enumerate(self.blocks)}
+        for i, block in enumerate(self.blocks):
+            block.successors = self.successors(evaluator, i)
+
+    def successors(self, evaluator, i):
+        block = self.blocks[i]
+        statement = evaluator.statements[block.end - 1]
+        node = control(statement)
+        following = [i + 1] if i + 1 < len(self.blocks) else []
+        if not isinstance(node, (Goto, Gosub, Return, End, Quit)):
+            return following
+        if isinstance(node, (Goto, Gosub)):
+            if isinstance(node.operand, Num):
+                target = evaluator.target_position(node)
+                targets = [] if target is None else \
+                    [self.block_index[target]]
+            else:
+                targets = list(range(len(self.blocks)))
+        else:
+            targets = []
+        if isinstance(statement, If) or isinstance(node, Gosub):
+            targets += following
+        return sorted(set(targets))
+
+    def reachable(self):
+        'Indexes of the blocks a RUN can get to'
+        seen = set()
+        todo = [0] if self.blocks else []
+        while todo:
+            i = todo.pop()
+            if i not in seen:
+                seen.add(i)
+                todo.extend(self.blocks[i].successors)
+        return seen
+
+    def unreachable_lines(self):
+        'Numbers of the lines no RUN can get to, in order'
+        reachable = self.reachable()
+        return [self.line_numbers[pc]
+                for i, block in enumerate(self.blocks) if i not in reachable
+                for pc in range(block.start, block.end)]
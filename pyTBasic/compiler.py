@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+
+import operator
+from functools import partial
+from pyTBasic.basic_types import Index, Num, Var
+from pyTBasic.evaluator import (BasicRuntimeError, Evaluator, NodeVisitor,
+                                divide)
+
+
+class Compiler(NodeVisitor):
+    '''
+    Translates a parsed statement into nested closures, once. Constants
+    and variable reads are bound straight into the closure of the
+    operator that uses them, so evaluating Add(Var('I'), Num(1)) is a
+    single call instead of three visits. Control flow statements act on
+    the machine (a ClosureEvaluator) that owns the program counter.
+    Nodes without a visit_ method fall back to the machine's visitor.
+    '''
+
+    def __init__(self, machine):
+        self.machine = machine
+
+    def generic_visit(self, node):
+        return partial(self.machine.visit, node)
+
+    def binary(self, node, op):
+        'Closure applying op to both operands of node'
+        variables = self.machine.slots
+        left, right = node.left, node.right
+        if isinstance(left, Var):
+            a = left.slot
+            if isinstance(right, Num):
+                b = right.value
+                return lambda: op(variables[a], b)
+            if isinstance(right, Var):
+                b = right.slot
+                return lambda: op(variables[a], variables[b])
+            r = self.visit(right)
+            return lambda: op(variables[a], r())
+        if isinstance(left, Num):
+            a = left.value
+            if isinstance(right, Var):
+                b = right.slot
+                return lambda: op(a, variables[b])
+            r = self.visit(right)
+            return lambda: op(a, r())
+        l = self.visit(left)
+        if isinstance(right, Num):
+            b = right.value
+            return lambda: op(l(), b)
+        if isinstance(right, Var):
+            b = right.slot
+            return lambda: op(l(), variables[b])
+        r = self.visit(right)
+        return lambda: op(l(), r())
+
+    # Expressions
+
+    def visit_String(self, node):
+        value = node.value
+        return lambda: value
+
+    def visit_Num(self, node):
+        value = node.value
+        return lambda: value
+
+    def visit_Var(self, node):
+        return partial(self.machine.slots.__getitem__, node.slot)
+
+    def visit_Neg(self, node):
+        operand = self.visit(node.operand)
+        return lambda: -operand()
+
+    def visit_Index(self, node):
+        # In range subscripts are read here, anything else is left to
+        # the machine to report
+        arrays = self.machine.arrays
+        element = self.machine.element
+        name = node.left.value
+        subscript = self.visit(node.right)
+
+        def index():
+            i = subscript()
+            values = arrays.get(name)
+            if values is not None and 0 <= i < len(values):
+                return values[i]
+            return element(name, i)
+        return index
+
+    def visit_Add(self, node):
+        return self.binary(node, operator.add)
+
+    def visit_Sub(self, node):
+        return self.binary(node, operator.sub)
+
+    def visit_Mul(self, node):
+        return self.binary(node, operator.mul)
+
+    def visit_Div(self, node):
+        return self.binary(node, divide)
+
+    def visit_Equal(self, node):
+        return self.binary(node, operator.eq)
+
+    def visit_NotEqual(self, node):
+        return self.binary(node, operator.ne)
+
+    def visit_GreaterThan(self, node):
+        return self.binary(node, operator.gt)
+
+    def visit_GreaterOrEqualThan(self, node):
+        return self.binary(node, operator.ge)
+
+    def visit_LessThan(self, node):
+        return self.binary(node, operator.lt)
+
+    def visit_LessOrEqualThan(self, node):
+        return self.binary(node, operator.le)
+
+    # Statements
+
+    def visit_Print(self, node):
+        parts = [self.visit(i) for i in node.operand]
+        machine = self.machine
+
+        def print_():
+            machine.output.write_line(''.join([str(part())
+                                               for part in parts]))
+        return print_
+
+    def visit_If(self, node):
+        condition = self.visit(node.left)
+        then = self.visit(node.right)
+
+        def if_():
+            if condition():
+                then()
+        return if_
+
+    def visit_Let(self, node):
+        if isinstance(node.left, Index):
+            return self.store_element(node)
+        variables = self.machine.slots
+        slot = node.left.slot
+        if isinstance(node.right, Num):
+            value = node.right.value
+
+            def let():
+                variables[slot] = value
+        else:
+            expr = self.visit(node.right)
+
+            def let():
+                variables[slot] = expr()
+        return let
+
+    visit_Assign = visit_Let
+
+    def store_element(self, node):
+        arrays = self.machine.arrays
+        set_element = self.machine.set_element
+        name = node.left.left.value
+        subscript = self.visit(node.left.right)
+        expr = self.visit(node.right)
+
+        def let():
+            i = subscript()
+            value = expr()
+            values = arrays.get(name)
+            if values is not None and 0 <= i < len(values):
+                try:
+                    values[i] = value
+                    return
+                except OverflowError:
+                    pass
+            set_element(name, i, value)
+        return let
+
+    def visit_Goto(self, node):
+        machine = self.machine
+        label = machine.jump_table.get(node)
+        if label is None:
+            def goto():
+                machine.pc = machine.jump_target(node)
+        else:
+            resolve = machine.resolve
+
+            def goto():
+                if label.layout is machine.layout:
+                    machine.pc = label.pc
+                else:
+                    machine.pc = resolve(label)
+        return goto
+
+    def visit_Gosub(self, node):
+        machine = self.machine
+        stack = machine.gosub_stack
+        depth = machine.max_gosub_depth
+        label = machine.jump_table.get(node)
+        resolve = machine.resolve
+
+        def gosub():
+            if len(stack) >= depth:
+                raise BasicRuntimeError('GOSUB nested more than {} deep'
+                                        .format(depth))
+            if label is None:
+                pc = machine.jump_target(node)
+            elif label.layout is machine.layout:
+                pc = label.pc
+            else:
+                pc = resolve(label)
+            stack.append(machine.pc)
+            machine.pc = pc
+        return gosub
+
+    def visit_Return(self, node):
+        machine = self.machine
+        stack = machine.gosub_stack
+
+        def return_():
+            if not stack:
+                raise BasicRuntimeError('RETURN without GOSUB')
+            machine.pc = stack.pop()
+        return return_
+
+    def visit_End(self, node):
+        machine = self.machine
+
+        def end():
+            machine.pc = len(machine.code)
+        return end
+
+    def visit_Nop(self, node):
+        return lambda: None
+
+
+class ClosureEvaluator(Evaluator):
+    '''
+    Evaluator that compiles each stored line into closures when the
+    program is loaded and runs those instead of walking the tree.
+    Immediate mode statements are still evaluated by the visitor.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.compiler = Compiler(self)
+
+    def compile_line(self, statement):
+        return self.compiler.visit(statement)
@@ -1,16 +1,197 @@
 #!/usr/bin/env python3
 
-symbol_table = {chr(i): 0 for i in range(65, 91)}
-line_num_table = []
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableMapping
+from functools import partial
+from pyTBasic.basic_types import (NAMES, SLOTS, Assign, Goto, Gosub, If,
+                                  Index, Input, Let, Num, Print, String)
+from pyTBasic.cfg import ControlFlowGraph, constant_target, ends_block
+from pyTBasic.output import as_sink
+from pyTBasic.profiler import LineProfiler
+from pyTBasic.program import Program
+
+
+class Variables(MutableMapping):
+    '''
+    The variables A to Z. Their values are kept in slots, a list indexed
+    by the slot the parser gives each Var node; the object is also a
+    mapping from variable name to value.
+    '''
+    __slots__ = ['slots']
+
+    def __init__(self, values=()):
+        self.slots = [0] * len(NAMES)
+        self.update(values)
+
+    def __getitem__(self, name):
+        return self.slots[SLOTS[name]]
+
+    def __setitem__(self, name, value):
+        self.slots[SLOTS[name]] = value
+
+    def __delitem__(self, name):
+        raise TypeError('Variables cannot be deleted')
+
+    def __iter__(self):
+        return iter(NAMES)
+
+    def __len__(self):
+        return len(NAMES)
+
+    def __repr__(self):
+        return 'Variables({!r})'.format(dict(self))
+
+
+symbol_table = Variables()
+line_num_table = Program()
+
+ARRAY_TYPE = 'q'                # Arrays hold signed 64 bit integers
+MAX_UNIT = 32                   # Most statements fused into one unit
+
+
+class BasicRuntimeError(RuntimeError):
+    '''
+    Error raised while executing a statement. line is the number of
+    the program line that failed, or None in immediate mode.
+    '''
+
+    def __init__(self, message, line=None):
+        super().__init__(message)
+        self.line = line
+
+    def __str__(self):
+        if self.line is None:
+            return super().__str__()
+        return '{} IN LINE {}'.format(super().__str__(), self.line)
+
+
+class QuitRequested(Exception):
+    '''
+    Raised by QUIT. Whoever drives the session decides what it means:
+    the prompt and the server leave, a batch run ends the program.
+    '''
+
+
+class NeedInput(Exception):
+    '''
+    Raised by an input source with no line ready yet. A run driven by
+    Evaluator.run_slices() pauses and runs the INPUT again later.
+    '''
+
+
+class LimitExceeded(BasicRuntimeError):
+    'Raised when a run goes over one of its Limits'
+
+
+class Limits:
+    '''
+    Budget for one run of a program. Any limit left as None is not
+    enforced.
+
+      max_steps     statements executed
+      max_time      wall clock seconds
+      max_int_bits  bits in a value stored in a variable
+      max_string    characters in a string literal of a PRINT
+      max_elements  elements in all the arrays DIMmed
+    '''
+
+    def __init__(self, max_steps=None, max_time=None, max_int_bits=None,
+                 max_string=None, max_elements=None):
+        self.max_steps = max_steps
+        self.max_time = max_time
+        self.max_int_bits = max_int_bits
+        self.max_string = max_string
+        self.max_elements = max_elements
+
+
+def assigned_names(node):
+    'Names of the variables a statement can store into'
+    while isinstance(node, If):
+        node = node.right
+    if isinstance(node, (Let, Assign)) and not isinstance(node.left, Index):
+        return (node.left.value,)
+    if isinstance(node, Input):
+        return tuple(var.value for var in node.operand)
+    return ()
+
+
+class Label:
+    '''
+    Constant jump target. pc is the position of line number in the
+    evaluator's loaded program, valid while layout is the evaluator's
+    layout; lines inserted or deleted before it make it stale, and it
+    is looked up again the next time it is jumped to.
+    '''
+    __slots__ = ['number', 'pc', 'layout']
+
+    def __init__(self, number):
+        self.number = number
+        self.pc = None
+        self.layout = None
+
+
+def divide(a, b):
+    'a / b, rounded down as BASIC divides'
+    try:
+        return a // b
+    except ZeroDivisionError:
+        raise BasicRuntimeError('Division by zero') from None
+
+
+def string_lengths(node):
+    'Lengths of the string literals a statement prints'
+    while isinstance(node, If):
+        node = node.right
+    if isinstance(node, Print):
+        return [len(i.value) for i in node.operand if isinstance(i, String)]
+    return []
+
+
+def fused(steps):
+    '''
+    One callable running steps, (line number, callable) pairs, in
+    order. A BasicRuntimeError is given the line it came from.
+    '''
+    steps = tuple(steps)
+
+    def unit():
+        try:
+            for number, step in steps:
+                step()
+        except BasicRuntimeError as e:
+            if e.line is None:
+                e.line = number
+            raise
+    return unit
 
 
 class NodeVisitor:
+    '''
+    Calls the visit_<node class name> method for a node. Each visitor
+    class keeps its own table of node class -> method, filled in the
+    first time a node class is visited, so the method name is only
+    built and looked up once per class.
+    '''
+    _dispatch = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = {}
+
     def visit(self, node):
-        methname = 'visit_' + type(node).__name__
-        meth = getattr(self, methname, None)
-        if meth is None:
-            meth = self.generic_visit
-        return meth(node)
+        try:
+            meth = self._dispatch[type(node)]
+        except KeyError:
+            meth = self._bind(type(node))
+        return meth(self, node)
+
+    @classmethod
+    def _bind(cls, node_class):
+        meth = getattr(cls, 'visit_' + node_class.__name__, cls.generic_visit)
+        cls._dispatch[node_class] = meth
+        return meth
 
     def generic_visit(self, node):
         raise RuntimeError('No {} method'
@@ -18,6 +199,69 @@ class NodeVisitor:
 
 
 class Evaluator(NodeVisitor):
+    '''
+    Tree walking evaluator. RUN lays the stored program out as a list of
+    statements and drives a program counter over it. Constant GOTO and
+    GOSUB targets are Labels caching the position they jump to,
+    computed targets are looked up by bisection. The statements from
+    a position to the end of its basic block (see cfg) are fused into
+    one unit the first time they run, and a run dispatches a unit at a
+    time.
+
+    The layout, the executable form of each line and what is known
+    about it are kept between runs. Lines edited since are brought up
+    to date one at a time by update_line(), unless the whole program
+    was replaced or incremental is false.
+
+    The program and variables default to the module's line_num_table
+    and symbol_table, shared by every evaluator that is not given its
+    own; variables may also be a mapping of their first values. PRINT
+    writes to output, an output.Sink or a file like object (sys.stdout
+    when None), which is flushed at the end of every run.
+    INPUT reads from input, an iterator of lines (the prompt when None).
+
+    Arrays made by DIM belong to the evaluator. Each is a contiguous
+    array of 64 bit integers; with check_bounds false, a negative
+    subscript counts from the end instead of being an error.
+    '''
+    incremental = True          # Load edited lines one at a time
+
+    def __init__(self, max_gosub_depth=256, limits=None, program=None,
+                 variables=None, output=None, input=None, check_bounds=True):
+        self.max_gosub_depth = max_gosub_depth
+        self.limits = limits        # Limits enforced on every run
+        self.program = line_num_table if program is None else program
+        if variables is None:
+            variables = symbol_table
+        elif not isinstance(variables, Variables):
+            variables = Variables(variables)
+        self.variables = variables
+        self.slots = variables.slots  # Values of the variables, by slot
+        self.arrays = {}            # Name -> array made by DIM
+        self.check_bounds = check_bounds
+        self.output = as_sink(output)
+        self.input = input
+        self.statements = []        # Statements of the stored lines, in order
+        self.code = []              # Executable form of each statement
+        self.line_numbers = []      # Line number of each statement
+        self.stores = []            # assigned_names() of each statement
+        self.longest = []           # Longest string each statement prints
+        self.units = []             # Fused unit starting at each position
+        self.sizes = []             # Statements in each unit
+        self.targets = {}           # Line number -> constant jumps to it
+        self.layout = object()      # Replaced when positions change
+        self.labels = {}            # Line number -> Label
+        self.jump_table = {}        # Goto/Gosub node -> Label
+        self.gosub_stack = []       # Return positions
+        self.pc = 0                 # Position of the next statement
+        self.running = False
+        self.version = None         # self.program.version last loaded
+        self.profiler = None        # LineProfiler to profile every RUN with
+        self.steps = 0              # Statements run by the last monitor()
+        self.input_values = []      # Values read by an unfinished INPUT
+        self.defer_runs = False     # Leave runs in deferred, see start()
+        self.deferred = None        # Position of the last deferred run
+
     def visit_String(self, node):
         return node.value
 
@@ -25,7 +269,13 @@ class Evaluator(NodeVisitor):
         return node.value
 
     def visit_Var(self, node):
-        return symbol_table[node.value]
+        return self.slots[node.slot]
+
+    def visit_Neg(self, node):
+        return -self.visit(node.operand)
+
+    def visit_Index(self, node):
+        return self.element(node.left.value, self.visit(node.right))
 
     def visit_Add(self, node):
         return self.visit(node.left) + self.visit(node.right)
@@ -37,7 +287,7 @@ class Evaluator(NodeVisitor):
         return self.visit(node.left) * self.visit(node.right)
 
     def visit_Div(self, node):
-        return self.visit(node.left) // self.visit(node.right)
+        return divide(self.visit(node.left), self.visit(node.right))
 
     def visit_Equal(self, node):
         return self.visit(node.left) == self.visit(node.right)
@@ -60,55 +310,493 @@ class Evaluator(NodeVisitor):
     def visit_Print(self, node):
         print_string = [str(self.visit(i)) for i in node.operand]
 
-        print(''.join(print_string))
+        self.output.write_line(''.join(print_string))
 
     def visit_If(self, node):
-        methname = 'visit_' + type(node.left).__name__
-        visit_relop = getattr(self, methname, None)
-        if visit_relop is not None:
-            result = visit_relop(node.left)
-        else:
-            raise SyntaxError('Whoa, something went completely wrong!')
-        if result:
+        if self.visit(node.left):
             return self.visit(node.right)
 
     def visit_Goto(self, node):
-        pass
+        if self.running:
+            self.pc = self.jump_target(node)
+        else:
+            self.load()
+            self.start(self.jump_target(node))
 
     def visit_Input(self, node):
-        pass
+        # Values read by an INPUT interrupted by NeedInput are kept for
+        # when it runs again
+        values = self.input_values
+        while len(values) < len(node.operand):
+            text = self.read_line()
+            try:
+                values.append(int(text))
+            except ValueError:
+                values.clear()
+                raise BasicRuntimeError('Expected a number, got {!r}'
+                                        .format(text)) from None
+        for var, value in zip(node.operand, values):
+            self.slots[var.slot] = value
+        values.clear()
 
     def visit_Let(self, node):
-        symbol_table[self.visit(node.left)] = self.visit(node.right)
-
-    def visit_Assign(self, node):
-        symbol_table[self.visit(node.left)] = self.visit(node.right)
+        if isinstance(node.left, Index):
+            self.set_element(node.left.left.value,
+                             self.visit(node.left.right),
+                             self.visit(node.right))
+        else:
+            self.slots[node.left.slot] = self.visit(node.right)
+
+    visit_Assign = visit_Let
+
+    def visit_Dim(self, node):
+        for element in node.operand:
+            name = element.left.value
+            size = self.visit(element.right) + 1
+            if size < 1:
+                raise BasicRuntimeError('Negative size for array {}'
+                                        .format(name))
+            if self.limits is not None:
+                self.check_elements(name, size, self.limits.max_elements)
+            try:
+                self.arrays[name] = array(ARRAY_TYPE, [0]) * size
+            except MemoryError:
+                raise BasicRuntimeError('Out of memory for array {}'
+                                        .format(name)) from None
 
     def visit_Gosub(self, node):
-        pass
+        if len(self.gosub_stack) >= self.max_gosub_depth:
+            raise BasicRuntimeError('GOSUB nested more than {} deep'
+                                    .format(self.max_gosub_depth))
+        if self.running:
+            target = self.jump_target(node)
+            self.gosub_stack.append(self.pc)
+            self.pc = target
+        else:
+            self.load()
+            target = self.jump_target(node)
+            # Returning from an immediate GOSUB ends the run
+            self.gosub_stack.append(len(self.statements))
+            self.start(target)
 
     def visit_Return(self, node):
-        pass
+        if not self.gosub_stack:
+            raise BasicRuntimeError('RETURN without GOSUB')
+        self.pc = self.gosub_stack.pop()
 
     def visit_Clear(self, node):
-        pass
+        self.program.clear()
 
     def visit_List(self, node):
-        for line in sorted(line_num_table, key=self.sort_key):
-            print(line)
+        if node.operand is None:
+            lines = self.program
+        else:
+            lines = self.program.from_line(self.visit(node.operand))
+        for line in lines:
+            self.write_line(line)
 
     def visit_Run(self, node):
-        for line in sorted(line_num_table, key=self.sort_key):
-            self.visit(line.right)
+        self.load()
+        self.gosub_stack.clear()
+        self.input_values.clear()
+        self.start(0)
+
+    def visit_Profile(self, node):
+        'RUN once with profiling'
+        profiler = self.profiler
+        if profiler is None:
+            self.profiler = LineProfiler()
+        try:
+            self.visit_Run(node)
+        finally:
+            self.profiler = profiler
 
     def visit_End(self, node):
+        self.pc = len(self.statements)
+
+    def visit_Quit(self, node):
+        raise QuitRequested
+
+    def visit_Nop(self, node):
         pass
 
     def visit_LineNum(self, node):
-        line_num_table.append(node)
-
-    def sort_key(self, node):
-        return node.left.value
+        number = node.left.value
+        if node.right is not None:
+            self.program[number] = node
+        elif number in self.program:
+            del self.program[number]
+
+    def load(self):
+        'Bring the loaded program up to date with the stored one'
+        program = self.program
+        if self.version == program.version:
+            return
+        edits = None
+        if self.incremental and self.version is not None:
+            edits = program.edits_since(self.version)
+        if edits is None:
+            self.rebuild()
+        else:
+            for number in dict.fromkeys(edits):
+                self.update_line(number)
+        self.version = program.version
+
+    def rebuild(self):
+        'Lay out the whole stored program and compile every line'
+        self.statements = [line.right for line in self.program]
+        self.line_numbers = self.program.numbers()
+        self.layout = object()
+        self.jump_table = {}
+        for statement in self.statements:
+            self.resolve_jump(statement)
+        self.stores = [assigned_names(statement)
+                       for statement in self.statements]
+        self.longest = [max(string_lengths(statement), default=0)
+                        for statement in self.statements]
+        self.code = [self.compile_line(statement)
+                     for statement in self.statements]
+        self.units = [None] * len(self.statements)
+        self.sizes = [1] * len(self.statements)
+        self.targets = {}
+        for statement in self.statements:
+            target = constant_target(statement)
+            if target is not None:
+                self.targets[target] = self.targets.get(target, 0) + 1
+
+    def update_line(self, number):
+        'Bring line number of the loaded program up to date'
+        numbers = self.line_numbers
+        tables = (self.statements, self.code, self.stores, self.longest,
+                  self.units, self.sizes)
+        pc = bisect_left(numbers, number)
+        loaded = pc < len(numbers) and numbers[pc] == number
+        if loaded:
+            target = constant_target(self.statements[pc])
+            if target is not None:
+                self.targets[target] -= 1
+        if number not in self.program:
+            if loaded:
+                del numbers[pc]
+                for table in tables:
+                    del table[pc]
+                self.layout = object()
+                if pc:
+                    self.unfuse(pc - 1)
+            return
+        statement = self.program[number].right
+        if not loaded:
+            numbers.insert(pc, number)
+            for table in tables:
+                table.insert(pc, None)
+            self.layout = object()
+        self.statements[pc] = statement
+        self.resolve_jump(statement)
+        self.stores[pc] = assigned_names(statement)
+        self.longest[pc] = max(string_lengths(statement), default=0)
+        self.code[pc] = self.compile_line(statement)
+        self.unfuse(pc)
+        target = constant_target(statement)
+        if target is not None:
+            self.targets[target] = self.targets.get(target, 0) + 1
+            # Its target now starts a block
+            target = self.position(target)
+            if target is not None:
+                self.unfuse(target)
+
+    def leader(self, pc):
+        'Does a basic block start at position pc (not 0)?'
+        return (ends_block(self.statements[pc - 1]) or
+                self.targets.get(self.line_numbers[pc], 0) > 0)
+
+    def fuse(self, pc):
+        '''
+        Unit running the loaded statements from pc to the end of their
+        basic block, at most MAX_UNIT of them, cached in self.units
+        '''
+        end = pc + 1
+        limit = min(len(self.statements), pc + MAX_UNIT)
+        while end < limit and not self.leader(end):
+            end += 1
+        if end == pc + 1:
+            unit = self.code[pc]
+        else:
+            unit = fused(zip(self.line_numbers[pc:end], self.code[pc:end]))
+        self.units[pc] = unit
+        self.sizes[pc] = end - pc
+        return unit
+
+    def unfuse(self, pc):
+        'Drop the units running the statement at position pc'
+        units = self.units
+        sizes = self.sizes
+        for start in range(pc, max(pc - MAX_UNIT, -1), -1):
+            if units[start] is not None and start + sizes[start] > pc:
+                units[start] = None
+
+    def control_flow(self):
+        'ControlFlowGraph of the stored program'
+        self.load()
+        return ControlFlowGraph(self)
+
+    def write_line(self, text):
+        'Write one line of PRINT or LIST output'
+        self.output.write_line(str(text))
+
+    def element(self, name, subscript):
+        'Value of element subscript of array name'
+        values = self.array(name)
+        if self.check_bounds and subscript < 0:
+            self.out_of_range(name, subscript)
+        try:
+            return values[subscript]
+        except IndexError:
+            self.out_of_range(name, subscript)
+
+    def set_element(self, name, subscript, value):
+        'Store value in element subscript of array name'
+        values = self.array(name)
+        if self.check_bounds and subscript < 0:
+            self.out_of_range(name, subscript)
+        try:
+            values[subscript] = value
+        except IndexError:
+            self.out_of_range(name, subscript)
+        except OverflowError:
+            raise BasicRuntimeError('Value too large for array {}'
+                                    .format(name)) from None
+
+    def array(self, name):
+        values = self.arrays.get(name)
+        if values is None:
+            raise BasicRuntimeError('Array {} not dimensioned'.format(name))
+        return values
+
+    def out_of_range(self, name, subscript):
+        raise BasicRuntimeError('Subscript {}({}) out of range'
+                                .format(name, subscript)) from None
+
+    def read_line(self):
+        'Read one line for INPUT'
+        if self.input is None:
+            self.output.flush()
+            return input('? ')
+        line = next(self.input, None)
+        if line is None:
+            raise BasicRuntimeError('Out of INPUT data')
+        return line
+
+    def compile_line(self, statement):
+        'Executable form of a statement: a callable taking no arguments'
+        return partial(self.visit, statement)
+
+    def resolve_jump(self, node):
+        while isinstance(node, If):
+            node = node.right
+        if isinstance(node, (Goto, Gosub)) and isinstance(node.operand, Num):
+            self.jump_table[node] = self.label(node.operand.value)
+
+    def label(self, number):
+        'The Label of line number'
+        label = self.labels.get(number)
+        if label is None:
+            label = self.labels[number] = Label(number)
+        return label
+
+    def position(self, number):
+        'Position of line number in the loaded program, or None'
+        numbers = self.line_numbers
+        pc = bisect_left(numbers, number)
+        if pc < len(numbers) and numbers[pc] == number:
+            return pc
+        return None
+
+    def resolve(self, label):
+        'Position of the line label jumps to'
+        if label.layout is not self.layout:
+            pc = self.position(label.number)
+            if pc is None:
+                raise BasicRuntimeError('Undefined line {}'
+                                        .format(label.number))
+            label.pc = pc
+            label.layout = self.layout
+        return label.pc
+
+    def target_position(self, node):
+        '''
+        Position a Goto or Gosub node with a constant target jumps to,
+        or None if the target is computed or not a line
+        '''
+        label = self.jump_table.get(node)
+        if label is None:
+            return None
+        return self.position(label.number)
+
+    def jump_target(self, node):
+        'Position of the line a Goto or Gosub node jumps to'
+        label = self.jump_table.get(node)
+        if label is not None:
+            return self.resolve(label)
+        number = self.visit(node.operand)
+        target = self.position(number)
+        if target is None:
+            raise BasicRuntimeError('Undefined line {}'.format(number))
+        return target
+
+    def execute(self, pc):
+        'Run the loaded program starting at position pc, a unit at a time'
+        code = self.code
+        units = self.units
+        sizes = self.sizes
+        self.pc = pc
+        self.running = True
+        try:
+            while self.pc < len(code):
+                pc = self.pc
+                unit = units[pc]
+                if unit is None:
+                    unit = self.fuse(pc)
+                self.pc = pc + sizes[pc]
+                unit()
+        except BasicRuntimeError as e:
+            if e.line is None:
+                e.line = self.line_numbers[pc]
+            raise
+        finally:
+            self.running = False
+
+    def start(self, pc):
+        '''
+        Run the loaded program from pc, through monitor() if need be.
+        With defer_runs set, nothing is run: pc is left in deferred for
+        the caller to drive with run_slices().
+        '''
+        if self.defer_runs:
+            self.deferred = pc
+            return
+        try:
+            if self.profiler is None and self.limits is None:
+                self.execute(pc)
+            else:
+                self.monitor(pc)
+        finally:
+            self.output.flush()
+
+    def callables(self):
+        'Zero argument callable running each loaded statement, for monitor()'
+        return self.code
+
+    def monitor(self, pc):
+        '''
+        Run the loaded program like execute, counting the hits and wall
+        time of every line in self.profiler and enforcing self.limits.
+        The profiler report is printed when the run stops, and the number
+        of statements executed is left in self.steps.
+        '''
+        for waiting in self.run_slices(pc):
+            # Only an input source that can be waited on raises NeedInput
+            raise BasicRuntimeError('Out of INPUT data',
+                                    self.line_numbers[self.pc])
+
+    def run_slices(self, pc, slice_steps=None):
+        '''
+        Generator doing the work of monitor(), so that a run can be
+        driven a slice at a time. It yields False after every
+        slice_steps statements, and True when the input source raised
+        NeedInput; that INPUT runs again when the generator is resumed.
+        Time spent suspended at a yield, waiting for input or for the
+        caller's other work, does not count against max_time.
+        '''
+        profiler = self.profiler
+        limits = self.limits or Limits()
+        clock = time.perf_counter
+        started = clock()
+        if profiler is not None:
+            profiler.start(list(self.line_numbers))
+        max_steps = limits.max_steps
+        steps = 0
+        pause = slice_steps         # Value of steps to yield at next
+        deadline = None
+        if limits.max_time is not None:
+            deadline = started + limits.max_time
+        checked = limits.max_int_bits is not None
+        stores = self.stores
+        code = self.callables()
+        self.pc = pc
+        self.running = True
+        try:
+            if limits.max_string is not None:
+                self.check_strings(limits.max_string)
+            while self.pc < len(code):
+                pc = self.pc
+                self.pc = pc + 1
+                if steps == max_steps:
+                    raise LimitExceeded('Step limit of {} exceeded'
+                                        .format(max_steps))
+                if steps == pause:
+                    pause += slice_steps
+                    waited = clock()
+                    yield False
+                    if deadline is not None:
+                        deadline += clock() - waited
+                steps += 1
+                try:
+                    if profiler is None:
+                        code[pc]()
+                    else:
+                        profiler.hits[pc] += 1
+                        start = clock()
+                        code[pc]()
+                        profiler.times[pc] += clock() - start
+                except NeedInput:
+                    self.pc = pc
+                    steps -= 1
+                    waited = clock()
+                    yield True
+                    if deadline is not None:
+                        deadline += clock() - waited
+                    continue
+                if deadline is not None and clock() > deadline:
+                    raise LimitExceeded('Time limit of {}s exceeded'
+                                        .format(limits.max_time))
+                if checked:
+                    for name in stores[pc]:
+                        self.check_int(self.variables[name], name,
+                                       limits.max_int_bits)
+        except BasicRuntimeError as e:
+            if e.line is None:
+                e.line = self.line_numbers[pc]
+            raise
+        finally:
+            self.running = False
+            self.steps = steps
+            if profiler is not None:
+                profiler.report(self.output)
+
+    def check_int(self, value, name, max_bits):
+        if isinstance(value, int) and value.bit_length() > max_bits:
+            raise LimitExceeded('Value of {} larger than {} bits'
+                                .format(name, max_bits))
+
+    def check_elements(self, name, size, max_elements):
+        'Check that DIMming name with size elements stays in max_elements'
+        if max_elements is None:
+            return
+        # A DIM of an existing array replaces it
+        size += sum(len(elements) for other, elements
+                    in self.arrays.items() if other != name)
+        if size > max_elements:
+            raise LimitExceeded('Arrays larger than {} elements'
+                                .format(max_elements))
+
+    def check_strings(self, max_length):
+        if max(self.longest, default=0) <= max_length:
+            return
+        for pc, longest in enumerate(self.longest):
+            if longest > max_length:
+                raise LimitExceeded('String longer than {} characters'
+                                    .format(max_length),
+                                    self.line_numbers[pc])
 
 
 class PrintParseTree(NodeVisitor):
@@ -151,6 +839,15 @@ class PrintParseTree(NodeVisitor):
     def visit_Assign(self, node):
         print(node)
 
+    def visit_Index(self, node):
+        print(node)
+
+    def visit_Neg(self, node):
+        print(node)
+
+    def visit_Dim(self, node):
+        print(node)
+
     def visit_Gosub(self, node):
         print(node)
 
@@ -166,8 +863,17 @@ class PrintParseTree(NodeVisitor):
     def visit_Run(self, node):
         print(node)
 
+    def visit_Profile(self, node):
+        print(node)
+
     def visit_End(self, node):
         print(node)
 
+    def visit_Quit(self, node):
+        print(node)
+
+    def visit_Nop(self, node):
+        print(node)
+
     def visit_LineNum(self, node):
         print(node)
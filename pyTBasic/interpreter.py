@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+from pyTBasic import loader
+from pyTBasic.basic_types import Run
+from pyTBasic.compiler import ClosureEvaluator
+from pyTBasic.evaluator import Variables
+from pyTBasic.output import BufferSink
+from pyTBasic.parser import BasicParser
+from pyTBasic.program import Program
+
+
+def new_variables():
+    'Variables A to Z, all 0'
+    return Variables()
+
+
+class Interpreter:
+    '''
+    One BASIC session. It owns a program, its variables, an output sink
+    and an input source, and has a parser and an evaluator of its own.
+    Interpreters share no mutable state, so any number of them can run
+    at the same time in different threads. A ParseCache given as cache
+    can be shared between them.
+
+    output is an output.Sink or a file like object for PRINT (sys.stdout
+    when None) and input an iterator of lines for INPUT (the prompt when
+    None).
+    '''
+
+    def __init__(self, evaluator_class=ClosureEvaluator, cache=None,
+                 limits=None, output=None, input=None):
+        self.program = Program()
+        self.variables = new_variables()
+        self.parser = BasicParser(cache)
+        self.evaluator = evaluator_class(limits=limits, program=self.program,
+                                         variables=self.variables,
+                                         output=output, input=input)
+
+    def execute(self, text):
+        'Parse and evaluate one line, as typed at the prompt'
+        self.evaluator.visit(self.parser.parse(text.upper()))
+
+    def load(self, source, filename='<program>'):
+        'Replace the stored program with the program in source'
+        lines = loader.parse_source(source, self.parser, filename)
+        self.program.clear()
+        self.program.update(lines)
+
+    def run(self, source, inputs=()):
+        '''
+        Load source, reset the variables and arrays and RUN it, reading
+        INPUT from the lines in inputs. Returns everything the program
+        printed.
+        Nothing is read from stdin or written to stdout. Syntax and
+        runtime errors are raised as they are by the evaluator.
+        '''
+        self.load(source)
+        self.variables.update(new_variables())
+        evaluator = self.evaluator
+        evaluator.arrays.clear()
+        output, input = evaluator.output, evaluator.input
+        evaluator.output = BufferSink()
+        evaluator.input = iter(inputs)
+        try:
+            evaluator.visit(Run(None))
+            return evaluator.output.getvalue()
+        finally:
+            evaluator.output, evaluator.input = output, input
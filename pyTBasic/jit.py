@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+
+from pyTBasic.basic_types import Goto, If
+from pyTBasic.evaluator import BasicRuntimeError, Evaluator
+from pyTBasic.transpiler import Transpiler, load, store
+
+FILENAME = '<trace>'
+HOT_LOOP = 50               # Backward jumps before a loop is compiled
+
+PROLOGUE = '''\
+def trace(variables=variables, element=element, set_element=set_element,
+          print=print, str=str, BasicRuntimeError=BasicRuntimeError):'''
+
+
+class Untraceable(Exception):
+    'The loop holds a statement a trace cannot run'
+
+
+class TraceCompiler(Transpiler):
+    '''
+    Generates the source of a Python function running one loop: the
+    lines from position head to tail, where tail jumps back to head.
+    Variables are held in locals. A jump back to head continues the
+    loop; every other way out (a jump elsewhere, END, or the back jump
+    not taken) is a guard returning the position to go on from.
+    Statements other than LET, PRINT, IF, constant GOTO and END make
+    the loop untraceable.
+    '''
+
+    def __init__(self, machine, head, tail):
+        super().__init__(machine)
+        self.head = head
+        self.tail = tail
+
+    def transpile(self):
+        '''
+        Return the source of the function and, for each of its lines,
+        the BASIC line number it was generated from (or None).
+        '''
+        machine = self.machine
+        self.names = set()
+        self.lines = []
+        self.emit(2, 'while True:')
+        for i in range(self.head, self.tail + 1):
+            number = machine.line_numbers[i]
+            self.emit(3, '# {}'.format(number), number)
+            for text in self.visit(machine.statements[i]):
+                self.emit(3, text, number)
+        self.emit(3, 'return {}'.format(self.tail + 1))
+        names = sorted(self.names)
+        self.lines[:0] = [(1, load(name), None) for name in names]
+        self.lines.insert(len(names), (1, 'try:', None))
+        self.emit(1, 'finally:')
+        for name in names:
+            self.emit(2, store(name))
+        if not names:
+            self.emit(2, 'pass')
+        source = [PROLOGUE]
+        line_map = [None] * len(PROLOGUE.splitlines())
+        for indent, text, number in self.lines:
+            source.append('    ' * indent + text)
+            line_map.append(number)
+        return '\n'.join(source) + '\n', line_map
+
+    def generic_visit(self, node):
+        raise Untraceable(type(node).__name__)
+
+    visit_Gosub = generic_visit
+    visit_Return = generic_visit
+
+    def visit_Goto(self, node):
+        target = self.machine.target_position(node)
+        if target is None:
+            raise Untraceable('computed GOTO')
+        if target == self.head:
+            return ['continue']
+        return ['return {}'.format(target)]
+
+    def visit_End(self, node):
+        return ['return {}'.format(len(self.machine.statements))]
+
+
+class Trace:
+    'A hot loop compiled to a Python function returning the exit position'
+    __slots__ = ['head', 'tail', 'source', 'line_map', 'function']
+
+    def __init__(self, head, tail, source, line_map, function):
+        self.head = head
+        self.tail = tail
+        self.source = source
+        self.line_map = line_map
+        self.function = function
+
+    def error_line(self, tb):
+        'BASIC line of the trace frame in traceback tb'
+        number = None
+        while tb is not None:
+            if tb.tb_frame.f_code is self.function.__code__:
+                number = self.line_map[tb.tb_lineno - 1]
+            tb = tb.tb_next
+        return number
+
+
+class JITEvaluator(Evaluator):
+    '''
+    Tree walking evaluator that compiles hot loops. Every jump from a
+    line back to the same or an earlier line is counted, keyed by both
+    lines. After threshold of them, the lines of the loop are compiled
+    by a TraceCompiler and later jumps back run the loop in the trace
+    until one of its guards exits. Loops the compiler refuses stay with
+    the tree walker and are not tried again. Runs under monitor()
+    (profiling or limits) always walk the tree. Editing a line drops
+    the traces running through it.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threshold = HOT_LOOP
+        self.counts = {}            # (head, tail) -> backward jumps seen
+        self.traces = {}            # (head, tail) -> Trace, None if refused
+
+    def rebuild(self):
+        super().rebuild()
+        self.counts.clear()
+        self.traces.clear()
+
+    def update_line(self, number):
+        # Traces hold positions: drop those of loops through the line,
+        # or all of them if positions moved
+        layout = self.layout
+        super().update_line(number)
+        if self.layout is not layout:
+            self.counts.clear()
+            self.traces.clear()
+            return
+        pc = self.position(number)
+        for key in [key for key in self.traces if key[0] <= pc <= key[1]]:
+            del self.traces[key]
+            self.counts.pop(key, None)
+
+    def execute(self, pc):
+        code = self.code
+        counts = self.counts
+        traces = self.traces
+        self.pc = pc
+        self.running = True
+        try:
+            while self.pc < len(code):
+                pc = self.pc
+                self.pc = pc + 1
+                code[pc]()
+                if self.pc > pc:
+                    continue
+                key = (self.pc, pc)
+                if key in traces:
+                    trace = traces[key]
+                    if trace is not None:
+                        self.pc = self.run_trace(trace)
+                    continue
+                counts[key] = counts.get(key, 0) + 1
+                if counts[key] >= self.threshold:
+                    traces[key] = self.compile_trace(*key)
+        except BasicRuntimeError as e:
+            if e.line is None:
+                e.line = self.line_numbers[pc]
+            raise
+        finally:
+            self.running = False
+
+    def run_trace(self, trace):
+        try:
+            return trace.function()
+        except BasicRuntimeError as e:
+            if e.line is None:
+                e.line = trace.error_line(e.__traceback__)
+            raise
+        except ZeroDivisionError as e:
+            raise BasicRuntimeError('Division by zero',
+                                    trace.error_line(e.__traceback__)) \
+                from None
+
+    def compile_trace(self, head, tail):
+        'Trace of the loop from head back from tail, or None'
+        node = self.statements[tail]
+        while isinstance(node, If):
+            node = node.right
+        if not isinstance(node, Goto) or self.target_position(node) != head:
+            # Not a loop, like a RETURN to before its GOSUB
+            return None
+        try:
+            source, line_map = TraceCompiler(self, head, tail).transpile()
+        except Untraceable:
+            return None
+        namespace = {'variables': self.slots,
+                     'element': self.element,
+                     'set_element': self.set_element,
+                     'print': self.write_line,
+                     'BasicRuntimeError': BasicRuntimeError}
+        exec(compile(source, FILENAME, 'exec'), namespace)
+        return Trace(head, tail, source, line_map, namespace['trace'])
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+import hashlib
+import marshal
+import os
+from pyTBasic import basic_types
+from pyTBasic.basic_types import VARIABLES, Node
+from pyTBasic.parser import BasicParser
+
+# Precompiled programs are stored next to the source, as
+# <magic><sha256 of the source><marshalled lines>.
+CACHE_SUFFIX = '.basc'
+MAGIC = b'TBASIC\x00\x02'
+
+NODE_CLASSES = {name: cls for name, cls in vars(basic_types).items()
+                if isinstance(cls, type) and issubclass(cls, Node)}
+
+
+def read_program(path, parser=None, cache=True):
+    '''
+    Parse the BASIC program in the file at path. The file is read in
+    one go and tokenized in a single pass; like input typed at the
+    prompt it is upper cased first. Returns a dict of line number ->
+    LineNum, where a bare line number removes an earlier line.
+
+    With cache, the parsed lines are saved in a .basc file next to
+    the source, and loaded from there while the source is unchanged.
+    Numbers and strings loaded are interned by parser, as if parsed.
+    '''
+    if parser is None:
+        parser = BasicParser()
+    with open(path, 'rb') as f:
+        source = f.read()
+    digest = hashlib.sha256(source).digest()
+    cache_path = path + CACHE_SUFFIX
+    if cache:
+        lines = read_cache(cache_path, digest, parser)
+        if lines is not None:
+            return lines
+    lines = parse_source(source.decode(), parser, path)
+    if cache:
+        write_cache(cache_path, digest, lines)
+    return lines
+
+
+def parse_source(text, parser=None, filename='<program>'):
+    '''
+    Parse the BASIC program in text, upper cased first. Returns a dict
+    of line number -> LineNum, where a bare line number removes an
+    earlier line.
+    '''
+    if parser is None:
+        parser = BasicParser()
+    lines = {}
+    for number, line in parser.parse_program(text.upper(), filename):
+        if line.right is None:
+            lines.pop(number, None)
+        else:
+            lines[number] = line
+    return lines
+
+
+def load_program(path, program, parser=None, cache=True):
+    'Replace the contents of program with the program in path'
+    lines = read_program(path, parser, cache)
+    program.clear()
+    program.update(lines)
+    return program
+
+
+def read_cache(cache_path, digest, parser):
+    'Lines stored in cache_path, or None if missing or stale'
+    try:
+        with open(cache_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    header = MAGIC + digest
+    if not data.startswith(header):
+        return None
+    try:
+        lines = marshal.loads(data[len(header):])
+        return {number: decode(line, parser) for number, line in lines}
+    except (EOFError, ValueError, TypeError, KeyError):
+        return None
+
+
+def write_cache(cache_path, digest, lines):
+    'Save lines to cache_path; a cache that cannot be written is skipped'
+    data = marshal.dumps([(number, encode(line))
+                          for number, line in lines.items()])
+    tmp_path = cache_path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(MAGIC + digest + data)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+def encode(value):
+    'Nodes become (class name, fields...) tuples, operand tuples lists'
+    if isinstance(value, Node):
+        return (type(value).__name__,) + tuple(
+            encode(getattr(value, name)) for name in value._fields)
+    if isinstance(value, (list, tuple)):
+        return [encode(i) for i in value]
+    return value
+
+
+def decode(value, parser):
+    'Inverse of encode, sharing leaves like parser does'
+    kind = type(value)
+    if kind is tuple:
+        name = value[0]
+        if name == 'Num':
+            return parser.number(value[1])
+        if name == 'String':
+            return parser.string(value[1])
+        if name == 'Var':
+            var = VARIABLES.get(value[1])
+            if var is not None and var.slot == value[2]:
+                return var
+        cls = NODE_CLASSES[name]
+        if len(value) == 3:
+            return cls(decode(value[1], parser), decode(value[2], parser))
+        if len(value) == 2:
+            return cls(decode(value[1], parser))
+        return cls(*[decode(i, parser) for i in value[1:]])
+    if kind is list:
+        return [decode(i, parser) for i in value]
+    return value
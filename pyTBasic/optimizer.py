@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+import operator
+from pyTBasic.basic_types import *
+from pyTBasic.evaluator import NodeVisitor
+
+FOLDERS = {
+    Add: operator.add,
+    Sub: operator.sub,
+    Mul: operator.mul,
+    Div: operator.floordiv,
+    Equal: operator.eq,
+    NotEqual: operator.ne,
+    GreaterThan: operator.gt,
+    GreaterOrEqualThan: operator.ge,
+    LessThan: operator.lt,
+    LessOrEqualThan: operator.le,
+}
+
+
+class Optimizer(NodeVisitor):
+    '''
+    Rewrites a parsed line before it is evaluated:
+
+      - operators whose operands are both numbers are folded
+      - x + 0, 0 + x, x - 0, x * 1, 1 * x and x / 1 become x
+      - IF with a constant condition becomes its THEN statement, or a
+        Nop when the condition is false
+
+    Parentheses never reach the tree (the parser only uses them for
+    grouping), so there are none left to collapse. Nodes that are not
+    changed are returned as they are. Every rewrite is recorded in
+    changes as a 'before -> after' string.
+    '''
+
+    def __init__(self):
+        self.changes = []
+
+    def optimize(self, node):
+        'Optimize a line, clearing the changes recorded for the last one'
+        self.changes = []
+        return self.visit(node)
+
+    def generic_visit(self, node):
+        return node
+
+    def rewrite(self, node, new):
+        self.changes.append('{!r} -> {!r}'.format(node, new))
+        return new
+
+    def binary(self, node):
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        if isinstance(left, Num) and isinstance(right, Num):
+            if not (isinstance(node, Div) and right.value == 0):
+                return self.rewrite(node, Num(FOLDERS[type(node)](
+                    left.value, right.value)))
+        if left is node.left and right is node.right:
+            return node
+        return type(node)(left, right)
+
+    def visit_LineNum(self, node):
+        if node.right is None:
+            return node
+        right = self.visit(node.right)
+        if right is node.right:
+            return node
+        return LineNum(node.left, right)
+
+    # Expressions
+
+    def visit_Add(self, node):
+        node = self.binary(node)
+        if isinstance(node, Add):
+            if isinstance(node.right, Num) and node.right.value == 0:
+                return self.rewrite(node, node.left)
+            if isinstance(node.left, Num) and node.left.value == 0:
+                return self.rewrite(node, node.right)
+        return node
+
+    def visit_Sub(self, node):
+        node = self.binary(node)
+        if isinstance(node, Sub):
+            if isinstance(node.right, Num) and node.right.value == 0:
+                return self.rewrite(node, node.left)
+        return node
+
+    def visit_Mul(self, node):
+        node = self.binary(node)
+        if isinstance(node, Mul):
+            if isinstance(node.right, Num) and node.right.value == 1:
+                return self.rewrite(node, node.left)
+            if isinstance(node.left, Num) and node.left.value == 1:
+                return self.rewrite(node, node.right)
+        return node
+
+    def visit_Div(self, node):
+        node = self.binary(node)
+        if isinstance(node, Div):
+            if isinstance(node.right, Num) and node.right.value == 1:
+                return self.rewrite(node, node.left)
+        return node
+
+    def visit_Neg(self, node):
+        operand = self.visit(node.operand)
+        if isinstance(operand, Num):
+            return self.rewrite(node, Num(-operand.value))
+        if isinstance(operand, Neg):
+            return self.rewrite(node, operand.operand)
+        if operand is node.operand:
+            return node
+        return Neg(operand)
+
+    def visit_Index(self, node):
+        subscript = self.visit(node.right)
+        if subscript is node.right:
+            return node
+        return Index(node.left, subscript)
+
+    visit_Equal = binary
+    visit_NotEqual = binary
+    visit_GreaterThan = binary
+    visit_GreaterOrEqualThan = binary
+    visit_LessThan = binary
+    visit_LessOrEqualThan = binary
+
+    # Statements
+
+    def visit_Print(self, node):
+        operand = [self.visit(i) for i in node.operand]
+        if all(new is old for new, old in zip(operand, node.operand)):
+            return node
+        return Print(operand)
+
+    def visit_If(self, node):
+        condition = self.visit(node.left)
+        then = self.visit(node.right)
+        if isinstance(condition, Num):
+            if condition.value:
+                return self.rewrite(node, then)
+            return self.rewrite(node, Nop(node))
+        if condition is node.left and then is node.right:
+            return node
+        return If(condition, then)
+
+    def visit_Let(self, node):
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        if left is node.left and right is node.right:
+            return node
+        return type(node)(left, right)
+
+    visit_Assign = visit_Let
+
+    def visit_Goto(self, node):
+        operand = self.visit(node.operand)
+        if operand is node.operand:
+            return node
+        return type(node)(operand)
+
+    visit_Gosub = visit_Goto
+
+    def visit_Dim(self, node):
+        operand = [self.visit(i) for i in node.operand]
+        if all(new is old for new, old in zip(operand, node.operand)):
+            return node
+        return Dim(operand)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+import sys
+
+''' Output sinks for PRINT.
+
+A sink collects the lines a program prints and hands them on in
+batches, joined into one string, as its flush policy says:
+
+  LINE  after every line
+  SIZE  once at least size characters are waiting
+  END   only when flushed, which the evaluator does at the end of a run
+
+A sink is also a writable file like object, so it can be passed as the
+file of print().
+'''
+
+LINE = 'line'
+SIZE = 'size'
+END = 'end'
+POLICIES = (LINE, SIZE, END)
+
+
+class Sink:
+    '''
+    Base class of the sinks: buffers text and calls emit() with each
+    batch. Subclasses implement emit().
+    '''
+
+    def __init__(self, policy=LINE, size=1 << 16):
+        if policy not in POLICIES:
+            raise ValueError('Unknown flush policy {!r}'.format(policy))
+        self.policy = policy
+        self.size = size
+        self.parts = []
+        self.pending = 0            # Characters in parts
+
+    def write(self, text):
+        self.parts.append(text)
+        if self.policy == SIZE:
+            self.pending += len(text)
+            if self.pending >= self.size:
+                self.flush()
+        elif self.policy == LINE and text.endswith('\n'):
+            self.flush()
+        return len(text)
+
+    def write_line(self, text):
+        'Write text and a newline'
+        text += '\n'
+        if self.policy == LINE:
+            if self.parts:
+                self.flush()
+            self.emit(text)
+            return
+        self.parts.append(text)
+        if self.policy == SIZE:
+            self.pending += len(text)
+            if self.pending >= self.size:
+                self.flush()
+
+    def flush(self):
+        'Emit everything buffered as one batch'
+        if self.parts:
+            data = ''.join(self.parts)
+            self.parts.clear()
+            self.pending = 0
+            self.emit(data)
+
+    def emit(self, data):
+        raise NotImplementedError
+
+
+class FileSink(Sink):
+    'Sink writing to a file, or to sys.stdout as it is when flushed'
+
+    def __init__(self, file=None, policy=LINE, size=1 << 16):
+        super().__init__(policy, size)
+        self.file = file
+
+    def emit(self, data):
+        (sys.stdout if self.file is None else self.file).write(data)
+
+
+class BufferSink(Sink):
+    'Sink keeping everything in memory, read back with getvalue()'
+
+    def __init__(self, policy=END, size=1 << 16):
+        super().__init__(policy, size)
+        self.batches = []
+
+    def emit(self, data):
+        self.batches.append(data)
+
+    def getvalue(self):
+        return ''.join(self.batches) + ''.join(self.parts)
+
+
+class CallbackSink(Sink):
+    'Sink calling callback with each batch of text'
+
+    def __init__(self, callback, policy=LINE, size=1 << 16):
+        super().__init__(policy, size)
+        self.callback = callback
+
+    def emit(self, data):
+        self.callback(data)
+
+
+def as_sink(output):
+    'Sink for output: a Sink, a file like object, or None for sys.stdout'
+    if isinstance(output, Sink):
+        return output
+    return FileSink(output)
@@ -1,23 +1,27 @@
 #!/usr/bin/env python3
 
 import re
-from collections import namedtuple
+import threading
+from array import array
+from collections import OrderedDict, namedtuple
 from pyTBasic.basic_types import *
 
 ''' Tiny Basic Grammar, EBNF
 
- line ::= number statement CR | statement CR
+ line ::= number statement CR | number CR | statement CR
 
    statement ::= PRINT expr-list
                  IF expression relop expression THEN statement
                  GOTO expression
                  INPUT var-list
-                 LET var = expression
+                 LET (var|element) = expression
+                 DIM element (, element)*
                  GOSUB expression
                  RETURN
                  CLEAR
                  LIST
                  RUN
+                 PROFILE
                  END
 
    expr-list ::= (string|expression) (, (string|expression) )*
@@ -28,7 +32,9 @@ from pyTBasic.basic_types import *
 
    term ::= factor ((*|/) factor)*
 
-   factor ::= var | number | (expression)
+   factor ::= (+|-|ε) (var | element | number | (expression))
+
+   element ::= var (expression)
 
    var ::= A | B | C ... | Y | Z
 
@@ -44,8 +50,8 @@ Added by me (maybe help with negative numbers?):
    binary_op ::= "+" | "-" | "*" | "/" | "%" | "**"
 '''
 
-KWORD   = r'(?P<KWORD>PRINT|IF|THEN|GOTO|INPUT|LET|GOSUB|RETURN|CLEAR|LIST|RUN|END|QUIT)'
-STRNG   = r'(?P<STRNG>"([^"]*)")'
+KWORD   = r'(?P<KWORD>PRINT|IF|THEN|GOTO|INPUT|LET|DIM|GOSUB|RETURN|CLEAR|LIST|RUN|PROFILE|END|QUIT)'
+STRNG   = r'(?P<STRNG>"([^"\n]*)")'
 VAR     = r'(?P<VAR>[A-Z])'
 NUM     = r'(?P<NUM>\d*\.\d+|\d+)'
 PLUS    = r'(?P<PLUS>\+)'
@@ -55,17 +61,32 @@ DIVIDE  = r'(?P<DIVIDE>/)'
 LPAREN  = r'(?P<LPAREN>\()'
 RPAREN  = r'(?P<RPAREN>\))'
 RELOP   = r'(?P<RELOP><>|><|<=|>=|<|>|=)'
-WS      = r'(?P<WS>\s+)'
+NL      = r'(?P<NL>\n)'
+WS      = r'(?P<WS>[^\S\n]+)'
 COM     = r'(?P<COM>,)'
 SEMI    = r'(?P<SEMI>;)'
 
 master_pat = re.compile('|'.join([KWORD, STRNG, VAR, NUM, PLUS, MINUS, TIMES,
-                                  DIVIDE, LPAREN, RPAREN, RELOP, WS, COM,
-                                  SEMI]))
+                                  DIVIDE, LPAREN, RPAREN, RELOP, NL, WS,
+                                  COM, SEMI]))
 
 # Tokenizer
 Token = namedtuple('Token', ['type', 'value'])
 
+# Token type codes of the compact token stream
+TOKEN_TYPES = ('KWORD', 'STRNG', 'VAR', 'NUM', 'PLUS', 'MINUS', 'TIMES',
+               'DIVIDE', 'LPAREN', 'RPAREN', 'RELOP', 'NL', 'COM', 'SEMI',
+               'ERROR')
+(T_KWORD, T_STRNG, T_VAR, T_NUM, T_PLUS, T_MINUS, T_TIMES, T_DIVIDE,
+ T_LPAREN, T_RPAREN, T_RELOP, T_NL, T_COM, T_SEMI,
+ T_ERROR) = range(len(TOKEN_TYPES))
+
+# master_pat group index -> token type code, None for whitespace
+GROUP_CODES = [None] * (master_pat.groups + 1)
+for _name, _index in master_pat.groupindex.items():
+    if _name != 'WS':
+        GROUP_CODES[_index] = TOKEN_TYPES.index(_name)
+
 
 def generate_tokens(text):
     '''
@@ -73,17 +94,137 @@ def generate_tokens(text):
     text: string to generate tokens from
     '''
     scanner = master_pat.scanner(text)
+    end = 0
     for match in iter(scanner.match, None):
-        tok = Token(match.lastgroup, match.group())
-        if tok.type != 'WS':
-            if tok.type == 'VAR':
-                yield Token('VAR', tok.value)
-            else:
-                yield tok
+        end = match.end()
+        if match.lastgroup != 'WS':
+            yield Token(match.lastgroup, match.group())
+    if end < len(text):
+        # Nothing matches here, so scanning cannot go any further
+        yield Token('ERROR', text[end])
+
+
+class TokenArrays:
+    '''
+    The tokens of text as parallel arrays: the type code of each token
+    and the offsets of its value in text. Values are only sliced out of
+    text when they are needed.
+    '''
+
+    __slots__ = ('text', 'types', 'starts', 'ends')
+
+    def __init__(self, text):
+        self.text = text
+        self.types = array('B')
+        self.starts = array('L')
+        self.ends = array('L')
+
+    def __len__(self):
+        return len(self.types)
+
+    def append(self, code, start, end):
+        self.types.append(code)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def value(self, index):
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def tokens(self):
+        'Generate the tokens as Token(type, value) pairs'
+        text = self.text
+        for code, start, end in zip(self.types, self.starts, self.ends):
+            yield Token(TOKEN_TYPES[code], text[start:end])
+
+
+def compact_tokens(text):
+    '''
+    Tokenize text with master_pat into TokenArrays, holding the same
+    tokens as generate_tokens(text).
+    '''
+    tokens = TokenArrays(text)
+    types = tokens.types.append
+    starts = tokens.starts.append
+    ends = tokens.ends.append
+    group_codes = GROUP_CODES
+    end = 0
+    for match in iter(master_pat.scanner(text).match, None):
+        code = group_codes[match.lastindex]
+        start, end = match.span()
+        if code is not None:
+            types(code)
+            starts(start)
+            ends(end)
+    if end < len(text):
+        tokens.append(T_ERROR, end, end + 1)
+    return tokens
 
 kwords = ('PRINT', 'IF', 'GOTO', 'INPUT',
-          'LET', 'GOSUB', 'RETURN', 'CLEAR',
-          'LIST', 'RUN', 'END')
+          'LET', 'DIM', 'GOSUB', 'RETURN', 'CLEAR',
+          'LIST', 'RUN', 'PROFILE', 'END')
+
+
+# Interned leaves
+MAX_LEAVES = 4096
+
+
+def remember(leaves, value, node):
+    'Store node under value, forgetting all the others when full'
+    if len(leaves) >= MAX_LEAVES:
+        leaves.clear()
+    leaves[value] = node
+
+
+# Parse cache
+class ParseCache:
+    '''
+    Bounded least recently used map from normalized source text to the
+    parsed line. One cache can be shared by any number of BasicParser
+    instances, in any number of threads. Parsed lines are shared by
+    every caller that hits the same text, so they must not be mutated.
+    '''
+
+    _missing = object()
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lines = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._lines)
+
+    @staticmethod
+    def normalize(text):
+        'Strip text, and collapse runs of blanks outside string literals'
+        if '"' in text:
+            return text.strip()
+        return ' '.join(text.split())
+
+    def lookup(self, key):
+        'Return the line parsed from key, or ParseCache._missing'
+        with self._lock:
+            line = self._lines.get(key, self._missing)
+            if line is self._missing:
+                self.misses += 1
+            else:
+                self._lines.move_to_end(key)
+                self.hits += 1
+            return line
+
+    def store(self, key, line):
+        with self._lock:
+            self._lines[key] = line
+            self._lines.move_to_end(key)
+            if len(self._lines) > self.maxsize:
+                self._lines.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._lines.clear()
+            self.hits = self.misses = 0
 
 
 # Parser
@@ -94,22 +235,97 @@ class BasicParser:
     to test and accept the current lookahead token. Use the ._expect()
     method to exactly match and discard the next token on the input
     (or raise a SyntaxError if it doesn't match).
+
+    With a ParseCache, parse() returns the cached tree for text it has
+    already seen. tokenizer is the function turning a text into
+    TokenArrays: compact_tokens or scanner.scan_arrays. The lookahead
+    is kept as a type code, so matching a token is an int comparison.
+
+    With intern, equal numbers and strings parsed are one node, as the
+    variables always are. Up to MAX_LEAVES of each are remembered.
     '''
 
+    def __init__(self, cache=None, tokenizer=compact_tokens, intern=True):
+        self.cache = cache
+        self.tokenizer = tokenizer
+        self.intern = intern
+        self.numbers = {}           # Value -> Num node
+        self.strings = {}           # Value -> String node
+
     def parse(self, text):
-        self.tokens = generate_tokens(text)
-        self.tok = None             # Last symbol consumed
-        self.nexttok = None         # Next symbol tokenized
-        self._advance()             # Load first lookahead token
+        cache = self.cache
+        if cache is None:
+            return self._parse(text)
+        key = cache.normalize(text)
+        line = cache.lookup(key)
+        if line is cache._missing:
+            line = self._parse(key)
+            cache.store(key, line)
+        return line
+
+    def _parse(self, text):
+        tokens = self.tokenizer(text)
+        self._reset(tokens, 0, len(tokens))
         return self.line()
 
+    def parse_program(self, text, filename='<program>'):
+        '''
+        Parse a whole program, one numbered line per text line, from a
+        single pass of the tokenizer over text. Blank lines are skipped.
+        Yields (line number, LineNum) pairs in text order.
+        '''
+        tokens = self.tokenizer(text)
+        types = tokens.types
+        count = len(types)
+        pos = 0
+        lineno = 1
+        while pos < count:
+            try:
+                stop = types.index(T_NL, pos)
+            except ValueError:
+                stop = count
+            if stop > pos:
+                yield self._parse_line(tokens, pos, stop, lineno, filename)
+            pos = stop + 1
+            lineno += 1
+
+    def _parse_line(self, tokens, pos, stop, lineno, filename):
+        self._reset(tokens, pos, stop)
+        try:
+            if self.nexttype != T_NUM:
+                raise SyntaxError('Expected line number')
+            line = self.line()
+            if self.nexttype is not None:
+                raise SyntaxError('Unexpected ' + tokens.value(self.pos))
+        except SyntaxError as e:
+            raise SyntaxError(e.msg,
+                              (filename, lineno, None, None)) from None
+        return line.left.value, line
+
+    def _reset(self, tokens, pos, stop):
+        'Parse the tokens from pos up to stop'
+        self.text = tokens.text
+        self.types = tokens.types
+        self.starts = tokens.starts
+        self.ends = tokens.ends
+        self.pos = pos              # Index of the lookahead token
+        self.stop = stop
+        self.toktype = None         # Type of the last symbol consumed
+        self.tokval = None          # and its value
+        self.nexttype = self.types[pos] if pos < stop else None
+
     def _advance(self):
         'Advance one token ahead'
-        self.tok, self.nexttok = self.nexttok, next(self.tokens, None)
+        pos = self.pos
+        self.toktype = self.nexttype
+        self.tokval = self.text[self.starts[pos]:self.ends[pos]]
+        pos += 1
+        self.pos = pos
+        self.nexttype = self.types[pos] if pos < self.stop else None
 
     def _accept(self, toktype):
         'Test and consume the next token if it matches toktype'
-        if self.nexttok and self.nexttok.type == toktype:
+        if self.nexttype == toktype:
             self._advance()
             return True
         else:
@@ -118,18 +334,21 @@ class BasicParser:
     def _expect(self, toktype):
         'Consume next token if it matches toktype or raise SyntaxError'
         if not self._accept(toktype):
-            raise SyntaxError('Expected ' + toktype)
+            raise SyntaxError('Expected ' + TOKEN_TYPES[toktype])
 
     # Grammar rules follow
 
     def line(self):
         '''
-         line ::= number statement CR | statement CR
+         line ::= number statement CR | number CR | statement CR
         '''
         # print(self.nexttok)
-        if self._accept('NUM'):
-            num = Num(self.try_int(self.tok.value))
-            right = self.statement()
+        if self._accept(T_NUM):
+            num = self.number(self.try_int(self.tokval))
+            # A line number on its own deletes that line
+            if self.nexttype is None:
+                return LineNum(num, None)
+            right = self.required(self.statement())
             ret_val = LineNum(num, right)
         else:
             ret_val = self.statement()
@@ -141,56 +360,63 @@ class BasicParser:
                       IF expression relop expression THEN statement
                       GOTO expression
                       INPUT var-list
-                      LET var = expression
+                      LET (var|element) = expression
+                      DIM element (, element)*
                       GOSUB expression
                       RETURN
                       CLEAR
                       LIST
                       RUN
+                      PROFILE
                       END
+                      QUIT
         '''
-        if self._accept('KWORD'):
-            if self.tok.value == 'PRINT':
+        if self._accept(T_KWORD):
+            if self.tokval == 'PRINT':
                 ret_val = self.kw_print()
-            elif self.tok.value == 'IF':
+            elif self.tokval == 'IF':
                 ret_val = self.kw_if()
-            elif self.tok.value == 'GOTO':
+            elif self.tokval == 'GOTO':
                 ret_val = self.kw_goto()
-            elif self.tok.value == 'INPUT':
+            elif self.tokval == 'INPUT':
                 ret_val = self.kw_input()
-            elif self.tok.value == 'LET':
+            elif self.tokval == 'LET':
                 ret_val = self.kw_let()
-            elif self.tok.value == 'GOSUB':
+            elif self.tokval == 'DIM':
+                ret_val = self.kw_dim()
+            elif self.tokval == 'GOSUB':
                 ret_val = self.kw_gosub()
-            elif self.tok.value == 'RETURN':
+            elif self.tokval == 'RETURN':
                 return Return(None)
-            elif self.tok.value == 'CLEAR':
+            elif self.tokval == 'CLEAR':
                 return Clear(None)
-            elif self.tok.value == 'LIST':
+            elif self.tokval == 'LIST':
                 return self.kw_list()
-            elif self.tok.value == 'RUN':
+            elif self.tokval == 'RUN':
                 return Run(None)
-            elif self.tok.value == 'END':
+            elif self.tokval == 'PROFILE':
+                return Profile(None)
+            elif self.tokval == 'END':
                 return End(None)
-            elif self.tok.value == 'QUIT':
-                exit()
+            elif self.tokval == 'QUIT':
+                return Quit(None)
         else:
             ret_val = self.expr()
         return ret_val
 
     def kw_print(self):
-        if not self.nexttok:
+        if self.nexttype is None:
             return (Print([]))
         right = self.expr_list()
         ret_val = Print(right)
         return ret_val
 
     def kw_if(self):
-        # kw = self.tok.value
-        left_expr = self.expr()
-        self._expect('RELOP')
-        relop = self.tok.value
-        right_expr = self.expr()
+        # kw = self.tokval
+        left_expr = self.required(self.expr())
+        self._expect(T_RELOP)
+        relop = self.tokval
+        right_expr = self.required(self.expr())
         if relop == '<>' or relop == '><':
             if_expr = NotEqual(left_expr, right_expr)
         elif relop == '>=':
@@ -203,49 +429,75 @@ class BasicParser:
             if_expr = LessThan(left_expr, right_expr)
         else:
             if_expr = Equal(left_expr, right_expr)
-        self._expect('KWORD')
+        self._expect(T_KWORD)
         # kw2 = 'THEN'
-        then_statement = self.statement()
+        then_statement = self.required(self.statement())
         # return (kw, (relop, left_expr, right_expr), kw2, then_statement)
         return If(if_expr, then_statement)
 
     def kw_goto(self):
-        # kw = self.tok.value
-        if not self.nexttok:
+        # kw = self.tokval
+        if self.nexttype is None:
             raise SyntaxError('Expected NUM')
-        right = self.expr()
+        right = self.required(self.expr())
         # return (kw, right)
         return Goto(right)
 
     def kw_input(self):
-        # kw = self.tok.value
+        # kw = self.tokval
         right = self.var_list()
         return Input(right)
 
     def kw_let(self):
-        # kw = self.tok.value
-        self._expect('VAR')
-        var = String(self.tok.value)
-        self._expect('RELOP')
-        # op = self.tok.value
-        if self.tok.value != '=':
+        # kw = self.tokval
+        self._expect(T_VAR)
+        var = self.variable()
+        if self._accept(T_LPAREN):
+            var = self.element(self.string(var.value))
+        self._expect(T_RELOP)
+        # op = self.tokval
+        if self.tokval != '=':
             raise SyntaxError('Expected EQUAL')
-        expr_val = self.expr()
+        expr_val = self.required(self.expr())
         # return Let(Assign(var, expr_val))
         return Let(var, expr_val)
 
+    def kw_dim(self):
+        '''
+        DIM element (, element)*
+        '''
+        elements = []
+        while True:
+            self._expect(T_VAR)
+            name = self.string(self.tokval)
+            self._expect(T_LPAREN)
+            elements.append(self.element(name))
+            if not self._accept(T_COM):
+                break
+        if self.nexttype is not None:
+            raise SyntaxError('Expected COMA')
+        return Dim(elements)
+
+    def element(self, name):
+        '''
+        element ::= var (expression)
+
+        Called with the opening parenthesis accepted
+        '''
+        subscript = self.required(self.expr())
+        self._expect(T_RPAREN)
+        return Index(name, subscript)
+
     def kw_gosub(self):
         # kw = 'GOSUB'
-        right = self.expr()
-        if not right:
-            raise SyntaxError('Expected EXPRESSION')
+        right = self.required(self.expr())
         return Gosub(right)
 
     def kw_list(self):
         # kw = 'LIST'
-        if self._accept('NUM'):
-            right = Num(self.try_int(self.tok.value))
-        elif self.nexttok:
+        if self._accept(T_NUM):
+            right = self.number(self.try_int(self.tokval))
+        elif self.nexttype is not None:
             raise SyntaxError('Expected NUM')
         else:
             return List(None)
@@ -261,12 +513,12 @@ class BasicParser:
         if temp:
             expr_list.append(temp)
 
-        while self._accept('STRNG') or self._accept('COM'):
-            if self.tok.type == 'STRNG':
-                expr_list.append(String(self.tok.value.strip('"')))
-            elif self.nexttok.type != 'STRNG':
-                expr_list.append(self.expr())
-        if self.nexttok:
+        while self._accept(T_STRNG) or self._accept(T_COM):
+            if self.toktype == T_STRNG:
+                expr_list.append(self.string(self.tokval.strip('"')))
+            elif self.nexttype != T_STRNG:
+                expr_list.append(self.required(self.expr()))
+        if self.nexttype is not None:
             raise SyntaxError('Expected COMA')
 
         return expr_list
@@ -276,10 +528,10 @@ class BasicParser:
         var-list ::= var (, var)*
         '''
         var_list = []
-        while self.nexttok and self._accept('VAR'):
-            var_list.append(Var(self.tok.value))
-            if self.nexttok:
-                self._expect('COM')
+        while self._accept(T_VAR):
+            var_list.append(self.variable())
+            if self.nexttype is not None:
+                self._expect(T_COM)
             else:
                 break
         return var_list
@@ -290,12 +542,12 @@ class BasicParser:
 
         '''
         expr_val = self.term()
-        while self._accept('PLUS') or self._accept('MINUS'):
-            op = self.tok.type
-            right = self.term()
-            if op == 'PLUS':
+        while self._accept(T_PLUS) or self._accept(T_MINUS):
+            op = self.toktype
+            right = self.required(self.term())
+            if op == T_PLUS:
                 expr_val = Add(expr_val, right)
-            elif op == 'MINUS':
+            elif op == T_MINUS:
                 expr_val = Sub(expr_val, right)
         return expr_val
 
@@ -304,58 +556,93 @@ class BasicParser:
         term ::= factor ((*|/) factor)*
         '''
         term_val = self.factor()
-        while self._accept('TIMES') or self._accept('DIVIDE') and\
-              (self.nexttok.type == 'NUM' or self.nexttok.type == 'VAR' or\
-              self.nexttok.type=='LPAREN'):
-            op = self.tok.type
-            right = self.factor()
-            if op == 'TIMES':
+        while self._accept(T_TIMES) or self._accept(T_DIVIDE) and\
+              (self.nexttype == T_NUM or self.nexttype == T_VAR or\
+              self.nexttype == T_LPAREN):
+            op = self.toktype
+            right = self.required(self.factor())
+            if op == T_TIMES:
                 term_val = Mul(term_val, right)
-            elif op == 'DIVIDE':
+            elif op == T_DIVIDE:
                 term_val = Div(term_val, right)
+        if self.toktype == T_DIVIDE and self.nexttype is None:
+            raise SyntaxError('Expected NUMBER or LPAREN')
         return term_val
 
     def factor(self):
         '''
-        factor ::= var | number | (expression)
+        factor ::= (+|-|ε) (var | element | number | (expression))
         '''
         # Is the next token a PLUS operator. Case is unary PLUS
-        if self.nexttok and self.nexttok.type == 'PLUS':
-            self._accept('PLUS')
-            if self._accept('NUM'):
-                ret_val = Num(self.try_int(self.tok.value))
-            elif self._accept('VAR'):
-                ret_val = Var(str(self.tok.value))
+        if self.nexttype == T_PLUS:
+            self._accept(T_PLUS)
+            if self._accept(T_NUM):
+                ret_val = self.number(self.try_int(self.tokval))
+            elif self.nexttype == T_VAR or self.nexttype == T_LPAREN:
+                ret_val = self.factor()
             else:
                 raise SyntaxError('Expected NUM or VAR')
         # Is the next token a MINUS operator. Case is unary MINUS
-        elif self.nexttok and self.nexttok.type == 'MINUS':
-            self._accept('MINUS')
-            if self._accept('NUM'):
-                ret_val = Num(int(-(self.try_int(self.tok.value))))
-            elif self._accept('VAR'):
-                ret_val = Var('-'+str(self.tok.value))
+        elif self.nexttype == T_MINUS:
+            self._accept(T_MINUS)
+            if self._accept(T_NUM):
+                ret_val = self.number(-self.try_int(self.tokval))
+            elif self.nexttype == T_VAR or self.nexttype == T_LPAREN:
+                ret_val = Neg(self.factor())
             else:
                 raise SyntaxError('Expected NUM or VAR')
-        elif self._accept('NUM'):
-            ret_val = Num(self.try_int(self.tok.value))
-        elif self._accept('VAR'):
-            ret_val = Var(str(self.tok.value))
-        elif self._accept('LPAREN'):
-            expr_val = self.expr()
-            self._expect('RPAREN')
+        elif self._accept(T_NUM):
+            ret_val = self.number(self.try_int(self.tokval))
+        elif self._accept(T_VAR):
+            ret_val = self.variable()
+            if self._accept(T_LPAREN):
+                ret_val = self.element(self.string(ret_val.value))
+        elif self._accept(T_LPAREN):
+            expr_val = self.required(self.expr())
+            self._expect(T_RPAREN)
             ret_val = expr_val
         # Is this just a string that ended up here?
         # elif self.nexttok and type(self.nexttok.value) == type(''):
-        elif self.nexttok and isinstance(self.nexttok.value, str):
+        elif self.nexttype is not None:
             return None
         else:
             raise SyntaxError('Expected NUMBER or LPAREN')
         return ret_val
 
+    def required(self, node):
+        '''
+        node, produced by a rule the grammar requires here. Rules give
+        None when the next token cannot start an expression.
+        '''
+        if node is None:
+            raise SyntaxError('Expected EXPRESSION')
+        return node
+
+    def number(self, value):
+        'Num node of value, shared with the equal ones parsed before'
+        node = self.numbers.get(value)
+        if node is None:
+            node = Num(value)
+            if self.intern:
+                remember(self.numbers, value, node)
+        return node
+
+    def string(self, value):
+        'String node of value, shared with the equal ones parsed before'
+        node = self.strings.get(value)
+        if node is None:
+            node = String(value)
+            if self.intern:
+                remember(self.strings, value, node)
+        return node
+
+    def variable(self):
+        'Var node of the VAR token just accepted, with its slot resolved'
+        return VARIABLES[self.tokval]
+
     def try_int(self, integer):
         try:
             new_int = int(integer)
         except ValueError:
-            raise SyntexError('Expected NUM')
+            raise SyntaxError('Expected NUM')
         return new_int
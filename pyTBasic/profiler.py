@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+
+class LineProfiler:
+    '''
+    Hit count and cumulative wall time of every line of a profiled RUN,
+    kept in lists indexed by position in the loaded program. report()
+    prints the hottest lines, by time, once the program has finished.
+    '''
+
+    def __init__(self, top=10):
+        self.top = top
+        self.line_numbers = []
+        self.hits = []
+        self.times = []
+
+    def start(self, line_numbers):
+        'Reset the counters for a run of the lines line_numbers'
+        self.line_numbers = line_numbers
+        self.hits = [0] * len(line_numbers)
+        self.times = [0.0] * len(line_numbers)
+
+    def lines(self):
+        'Return (line number, hits, seconds) of every line run, hottest first'
+        lines = [(number, hits, seconds) for number, hits, seconds
+                 in zip(self.line_numbers, self.hits, self.times) if hits]
+        lines.sort(key=lambda line: line[2], reverse=True)
+        return lines
+
+    def report(self, file=None):
+        'Print the hottest lines to file, or sys.stdout'
+        lines = self.lines()
+        total = sum(self.times) or 1.0
+        print('HOTTEST LINES', file=file)
+        print('{:>8} {:>10} {:>10} {:>6}'.format('LINE', 'HITS', 'TIME',
+                                                 '%TIME'), file=file)
+        for number, hits, seconds in lines[:self.top]:
+            print('{:>8} {:>10} {:>9.4f}s {:>5.1f}%'
+                  .format(number, hits, seconds, seconds / total * 100),
+                  file=file)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+from bisect import bisect_left
+
+MAX_EDITS = 4096            # Line edits remembered for edits_since()
+
+
+class Program:
+    '''
+    Stored program, indexed by line number. Line numbers are kept in a
+    sorted list next to a dict of lines, so lookups are O(1), inserts,
+    replacements and deletes locate their slot by bisection, and
+    iteration walks the lines in order without re-sorting.
+
+    The numbers of the last lines set or deleted one at a time are
+    remembered, so that whatever is derived from the program can be
+    brought up to date line by line, see edits_since().
+    '''
+
+    def __init__(self):
+        self._numbers = []          # Sorted line numbers
+        self._lines = {}            # Line number -> LineNum node
+        self.version = 0            # Bumped on every edit
+        self._edits = []            # Number edited by each version after
+        self._edits_from = 0        # this one
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def __contains__(self, number):
+        return number in self._lines
+
+    def __getitem__(self, number):
+        return self._lines[number]
+
+    def __setitem__(self, number, line):
+        'Insert a new line or replace the line with the same number'
+        if number not in self._lines:
+            numbers = self._numbers
+            if not numbers or number > numbers[-1]:
+                numbers.append(number)
+            else:
+                numbers.insert(bisect_left(numbers, number), number)
+        self._lines[number] = line
+        self._edited(number)
+
+    def __delitem__(self, number):
+        del self._lines[number]
+        del self._numbers[bisect_left(self._numbers, number)]
+        self._edited(number)
+
+    def _edited(self, number):
+        self.version += 1
+        self._edits.append(number)
+        if len(self._edits) > MAX_EDITS:
+            del self._edits[:MAX_EDITS // 2]
+            self._edits_from += MAX_EDITS // 2
+
+    def _replaced(self):
+        'Forget the edits, after a change to more than one line'
+        self.version += 1
+        self._edits.clear()
+        self._edits_from = self.version
+
+    def edits_since(self, version):
+        '''
+        Numbers of the lines set or deleted since version, oldest first,
+        or None if that is not known (too long ago, or many lines were
+        replaced at once)
+        '''
+        if version < self._edits_from:
+            return None
+        return self._edits[version - self._edits_from:]
+
+    def __iter__(self):
+        'Iterate over the stored lines in line number order'
+        lines = self._lines
+        for number in self._numbers:
+            yield lines[number]
+
+    def update(self, lines):
+        '''
+        Store many lines at once from a mapping or iterable of (number,
+        line) pairs. The line numbers are sorted once, at the end.
+        '''
+        self._lines.update(lines)
+        self._numbers = sorted(self._lines)
+        self._replaced()
+
+    def numbers(self):
+        return list(self._numbers)
+
+    def index(self, number):
+        'Position of the first line numbered number or higher'
+        return bisect_left(self._numbers, number)
+
+    def from_line(self, number):
+        'Iterate over the lines numbered number or higher, in order'
+        lines = self._lines
+        numbers = self._numbers
+        for i in range(self.index(number), len(numbers)):
+            yield lines[numbers[i]]
+
+    def clear(self):
+        self._numbers.clear()
+        self._lines.clear()
+        self._replaced()
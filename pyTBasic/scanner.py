@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+import re
+from pyTBasic.parser import (GROUP_CODES, NUM, T_COM, T_DIVIDE, T_KWORD,
+                             T_LPAREN, T_MINUS, T_NL, T_NUM, T_PLUS,
+                             T_RELOP, T_RPAREN, T_SEMI, T_STRNG, T_TIMES,
+                             T_VAR, T_ERROR, TokenArrays, master_pat)
+
+''' Hand written alternative to parser.generate_tokens.
+
+Instead of trying the 15 alternatives of master_pat at every position,
+scan_tokens looks at the first character and goes straight to the one
+rule that can match there. Whitespace is skipped without building a
+token, and keywords are found by looking up the few that start with
+the current letter. Tokens go straight into TokenArrays for the
+parser; scan_tokens reads them back as Token pairs. Characters outside
+ASCII are rare enough to hand back to master_pat, which keeps the
+Unicode rules for \\d and \\s exactly the same.
+'''
+
+KEYWORDS = ('PRINT', 'IF', 'THEN', 'GOTO', 'INPUT', 'LET', 'DIM', 'GOSUB',
+            'RETURN', 'CLEAR', 'LIST', 'RUN', 'PROFILE', 'END', 'QUIT')
+
+# First letter -> keywords starting with it, in master_pat order
+KEYWORDS_BY_LETTER = {}
+for _kw in KEYWORDS:
+    KEYWORDS_BY_LETTER.setdefault(_kw[0], []).append(_kw)
+
+# Rules for characters that do not make a token on their own
+LETTER, NUMBER, SPACE, STRING, RELOP = range(-5, 0)
+
+# Character -> token type code for one character tokens, or the rule
+# to continue with
+CHAR_TYPES = {
+    '+': T_PLUS, '-': T_MINUS, '*': T_TIMES, '/': T_DIVIDE,
+    '(': T_LPAREN, ')': T_RPAREN, ',': T_COM, ';': T_SEMI, '\n': T_NL,
+    '=': T_RELOP, '<': RELOP, '>': RELOP, '"': STRING, '.': NUMBER,
+}
+for _c in range(128):
+    _ch = chr(_c)
+    if 'A' <= _ch <= 'Z':
+        CHAR_TYPES[_ch] = LETTER
+    elif '0' <= _ch <= '9':
+        CHAR_TYPES[_ch] = NUMBER
+    elif _ch.isspace() and _ch != '\n':
+        CHAR_TYPES[_ch] = SPACE
+
+# Second character of two character relops
+RELOP_PAIRS = {'<': '>=', '>': '<='}
+
+num_pat = re.compile(NUM)
+space_pat = re.compile(r'[^\S\n]+')
+
+
+def scan_arrays(text):
+    '''
+    Scan text into TokenArrays holding the same tokens as
+    parser.generate_tokens(text), including the trailing ERROR token if
+    part of text cannot be scanned.
+    '''
+    tokens = TokenArrays(text)
+    types = tokens.types.append
+    starts = tokens.starts.append
+    ends = tokens.ends.append
+    pos = 0
+    end = len(text)
+    char_types = CHAR_TYPES
+    while pos < end:
+        ch = text[pos]
+        if ch == ' ':
+            pos += 1
+            continue
+        kind = char_types.get(ch)
+        if kind is None:
+            match = master_pat.match(text, pos)
+            if match is None:
+                break
+            code = GROUP_CODES[match.lastindex]
+            if code is not None:
+                types(code)
+                starts(pos)
+                ends(match.end())
+            pos = match.end()
+            continue
+        start = pos
+        if kind >= 0:
+            code = kind
+            pos += 1
+        elif kind == LETTER:
+            code = T_VAR
+            pos += 1
+            for kw in KEYWORDS_BY_LETTER.get(ch, ()):
+                if text.startswith(kw, start):
+                    code = T_KWORD
+                    pos = start + len(kw)
+                    break
+        elif kind == NUMBER:
+            match = num_pat.match(text, pos)
+            if match is None:
+                break
+            code = T_NUM
+            pos = match.end()
+        elif kind == SPACE:
+            pos = space_pat.match(text, pos).end()
+            continue
+        elif kind == STRING:
+            close = text.find('"', pos + 1)
+            if close < 0 or text.find('\n', pos + 1, close) >= 0:
+                break
+            code = T_STRNG
+            pos = close + 1
+        else:
+            code = T_RELOP
+            if pos + 1 < end and text[pos + 1] in RELOP_PAIRS[ch]:
+                pos += 2
+            else:
+                pos += 1
+        types(code)
+        starts(start)
+        ends(pos)
+    if pos < end:
+        tokens.append(T_ERROR, pos, pos + 1)
+    return tokens
+
+
+def scan_tokens(text):
+    '''
+    Generate the same tokens as parser.generate_tokens(text), including
+    the trailing ERROR token if part of text cannot be scanned.
+    '''
+    return scan_arrays(text).tokens()
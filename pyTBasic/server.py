@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+
+import asyncio
+from collections import deque
+from pyTBasic.basic_types import Profile
+from pyTBasic.compiler import ClosureEvaluator
+from pyTBasic.evaluator import BasicRuntimeError, NeedInput, QuitRequested
+from pyTBasic.interpreter import Interpreter
+from pyTBasic.output import SIZE, FileSink
+from pyTBasic.parser import ParseCache
+from pyTBasic.profiler import LineProfiler
+
+PROMPT = '] '
+INPUT_PROMPT = '? '
+QUIT = ('BYE', 'QUIT', 'EXIT()')
+
+
+class Disconnected(Exception):
+    'The client went away'
+
+
+class StreamOutput:
+    'File like object writing PRINT output to an asyncio stream'
+
+    def __init__(self, writer):
+        self.writer = writer
+
+    def write(self, text):
+        self.writer.write(text.encode())
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class Session:
+    '''
+    Interpreter of one connection. Lines typed at the prompt are
+    evaluated as they are in the REPL, any error being reported
+    without ending the session. Runs are driven slice_steps
+    statements at a time, giving the event loop back between slices,
+    so one busy program does not hold up the other sessions. A program
+    waiting on INPUT prompts for it and awaits the next line. PRINT
+    output is buffered and sent once per slice.
+    '''
+
+    def __init__(self, reader, writer, evaluator_class=ClosureEvaluator,
+                 cache=None, limits=None, slice_steps=1000):
+        self.reader = reader
+        self.writer = writer
+        self.slice_steps = slice_steps
+        self.lines = deque()        # Lines typed for INPUT, not yet read
+        self.output = FileSink(StreamOutput(writer), SIZE)
+        self.interpreter = Interpreter(evaluator_class, cache, limits,
+                                       self.output, self)
+        self.evaluator = self.interpreter.evaluator
+        self.evaluator.defer_runs = True
+
+    # The evaluator's input source
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.lines:
+            return self.lines.popleft()
+        raise NeedInput
+
+    async def write(self, text):
+        self.output.flush()
+        self.writer.write(text.encode())
+        await self.writer.drain()
+
+    async def readline(self):
+        line = await self.reader.readline()
+        if not line:
+            raise Disconnected
+        return line.decode(errors='replace').strip()
+
+    async def wait_for_input(self):
+        await self.write(INPUT_PROMPT)
+        self.lines.append(await self.readline())
+
+    async def serve(self):
+        try:
+            while True:
+                await self.write(PROMPT)
+                text = await self.readline()
+                if text.upper() in QUIT:
+                    break
+                if text:
+                    await self.execute(text)
+        except (Disconnected, ConnectionError, QuitRequested):
+            pass
+        finally:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def execute(self, text):
+        'Evaluate one line typed at the prompt'
+        evaluator = self.evaluator
+        profiler = evaluator.profiler
+        try:
+            node = self.interpreter.parser.parse(text.upper())
+            if isinstance(node, Profile) and profiler is None:
+                evaluator.profiler = LineProfiler()
+            while True:
+                try:
+                    evaluator.visit(node)
+                    break
+                except NeedInput:
+                    # Immediate INPUT
+                    await self.wait_for_input()
+            if evaluator.deferred is not None:
+                pc, evaluator.deferred = evaluator.deferred, None
+                await self.run(pc)
+        except SyntaxError as e:
+            await self.write('SYNTAX ERROR  {}\n'.format(e))
+        except BasicRuntimeError as e:
+            await self.write('RUNTIME ERROR  {}\n'.format(e))
+        except QuitRequested:
+            # What the run printed still goes out before the session ends
+            self.output.flush()
+            raise
+        except (Disconnected, ConnectionError):
+            raise
+        except Exception as e:
+            # A bug in one line must not end the session
+            await self.write('RUNTIME ERROR  {}: {}\n'.format(
+                type(e).__name__, e))
+        finally:
+            evaluator.profiler = profiler
+
+    async def run(self, pc):
+        'Drive the run the last statement started at pc'
+        slices = self.evaluator.run_slices(pc, self.slice_steps)
+        try:
+            for waiting in slices:
+                if waiting:
+                    await self.wait_for_input()
+                    continue
+                if self.reader.at_eof():
+                    raise Disconnected
+                self.output.flush()
+                await self.writer.drain()
+                await asyncio.sleep(0)
+        finally:
+            slices.close()
+
+
+async def start_server(host='127.0.0.1', port=8023,
+                       evaluator_class=ClosureEvaluator, limits=None,
+                       slice_steps=1000, backlog=1024):
+    '''
+    Start serving a BASIC session on every connection to host:port.
+    All sessions share one ParseCache. Returns the asyncio Server.
+    '''
+    cache = ParseCache()
+
+    async def handle(reader, writer):
+        await Session(reader, writer, evaluator_class, cache, limits,
+                      slice_steps).serve()
+
+    return await asyncio.start_server(handle, host, port, backlog=backlog)
+
+
+async def serve(*args, **kwargs):
+    'Run start_server(*args, **kwargs) until cancelled'
+    server = await start_server(*args, **kwargs)
+    async with server:
+        await server.serve_forever()
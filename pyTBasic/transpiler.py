@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+
+from pyTBasic.basic_types import (SLOTS, End, Goto, Gosub, If, Index, Num,
+                                  Return, String)
+from pyTBasic.evaluator import BasicRuntimeError, Evaluator, NodeVisitor
+
+FILENAME = '<basic>'
+
+PROLOGUE = '''\
+def basic_program(pc, variables=variables, stack=stack,
+                  position=position, visit=visit, nodes=nodes,
+                  print=print, element=element, set_element=set_element,
+                  str=str, len=len,
+                  BasicRuntimeError=BasicRuntimeError):'''
+
+
+def load(name):
+    'Line copying a variable from its slot to its local'
+    return '{} = variables[{}]'.format(name, SLOTS[name])
+
+
+def store(name):
+    'Line copying a variable from its local back to its slot'
+    return 'variables[{}] = {}'.format(SLOTS[name], name)
+
+
+class Transpiler(NodeVisitor):
+    '''
+    Generates the source of one Python function that runs the whole
+    program loaded into machine (a PythonEvaluator). The function is a
+    state machine: pc holds the position of the next line, and a binary
+    tree of comparisons dispatches it to the block of lines starting at
+    that position. Lines only start a block when something can jump to
+    them, so straight-line code runs without going back to the dispatch.
+    BASIC variables are Python locals for the duration of the call,
+    loaded from and stored back to the machine's slots.
+
+    Expression visit_ methods return a Python expression, statement
+    visit_ methods return a list of lines.
+    '''
+
+    def __init__(self, machine):
+        self.machine = machine
+
+    def transpile(self):
+        '''
+        Return the source of the function and, for each of its lines,
+        the BASIC line number it was generated from (or None).
+        '''
+        statements = self.machine.statements
+        self.names = set()          # BASIC variables used by the program
+        self.nodes = []             # Statements left to the visitor
+        self.lines = []             # (indent, source, BASIC line number)
+        labels = self.labels()
+        blocks = []
+        for i, start in enumerate(labels):
+            end = labels[i + 1] if i + 1 < len(labels) else len(statements)
+            blocks.append((start, end))
+        self.emit(1, 'try:')
+        self.emit(2, 'while True:')
+        self.emit(3, 'if pc >= {}:'.format(len(statements)))
+        self.emit(4, 'return')
+        if blocks:
+            self.dispatch(blocks, 0, len(blocks), 3)
+        self.emit(1, 'finally:')
+        for name in sorted(self.names):
+            self.emit(2, store(name))
+        if not self.names:
+            self.emit(2, 'pass')
+        header = [(1, load(name), None) for name in sorted(self.names)]
+        self.lines[:0] = header
+        source = [PROLOGUE]
+        line_map = [None] * len(PROLOGUE.splitlines())
+        for indent, text, number in self.lines:
+            source.append('    ' * indent + text)
+            line_map.append(number)
+        return '\n'.join(source) + '\n', line_map
+
+    def labels(self):
+        'Positions a jump, a RETURN or the start of a run can land on'
+        machine = self.machine
+        labels = {0}
+        for i, statement in enumerate(machine.statements):
+            while isinstance(statement, If):
+                statement = statement.right
+            if not isinstance(statement, (Goto, Gosub)):
+                continue
+            if isinstance(statement, Gosub):
+                labels.add(i + 1)
+            target = machine.target_position(statement)
+            if target is not None:
+                labels.add(target)
+            elif not isinstance(statement.operand, Num):
+                # A computed target can be any line
+                return list(range(len(machine.statements)))
+        return sorted(label for label in labels
+                      if label < len(machine.statements))
+
+    def emit(self, indent, text, number=None):
+        self.lines.append((indent, text, number))
+
+    def dispatch(self, blocks, lo, hi, indent):
+        if hi - lo == 1:
+            self.block(*blocks[lo], indent)
+            return
+        mid = (lo + hi) // 2
+        self.emit(indent, 'if pc < {}:'.format(blocks[mid][0]))
+        self.dispatch(blocks, lo, mid, indent + 1)
+        self.emit(indent, 'else:')
+        self.dispatch(blocks, mid, hi, indent + 1)
+
+    def block(self, start, end, indent):
+        machine = self.machine
+        for i in range(start, end):
+            self.index = i
+            number = machine.line_numbers[i]
+            self.emit(indent, '# {}'.format(number), number)
+            for text in self.visit(machine.statements[i]):
+                self.emit(indent, text, number)
+        if isinstance(machine.statements[end - 1],
+                      (Goto, Gosub, Return, End)):
+            # Never falls through
+            return
+        if end < len(machine.statements):
+            self.emit(indent, 'pc = {}'.format(end))
+            self.emit(indent, 'continue')
+        else:
+            self.emit(indent, 'return')
+
+    def target(self, node):
+        'Lines setting pc to the position node jumps to'
+        target = self.machine.target_position(node)
+        if target is not None:
+            return ['pc = {}'.format(target)]
+        if isinstance(node.operand, Num):
+            return ['raise BasicRuntimeError({!r})'.format(
+                'Undefined line {}'.format(node.operand.value))]
+        return ['target = {}'.format(self.visit(node.operand)),
+                'pc = position(target)',
+                'if pc is None:',
+                "    raise BasicRuntimeError('Undefined line {}'"
+                ".format(target))"]
+
+    def generic_visit(self, node):
+        'Run the statement through the visitor, with variables synced'
+        names = sorted(SLOTS)
+        self.names.update(names)
+        self.nodes.append(node)
+        return ([store(name) for name in names] +
+                ['visit(nodes[{}])'.format(len(self.nodes) - 1)] +
+                [load(name) for name in names])
+
+    # Expressions
+
+    def visit_String(self, node):
+        return repr(node.value)
+
+    def visit_Num(self, node):
+        return repr(node.value)
+
+    def visit_Var(self, node):
+        self.names.add(node.value)
+        return node.value
+
+    def visit_Neg(self, node):
+        return '(-{})'.format(self.visit(node.operand))
+
+    def visit_Index(self, node):
+        return 'element({!r}, {})'.format(node.left.value,
+                                          self.visit(node.right))
+
+    def binary(self, node, op):
+        return '({} {} {})'.format(self.visit(node.left), op,
+                                   self.visit(node.right))
+
+    def visit_Add(self, node):
+        return self.binary(node, '+')
+
+    def visit_Sub(self, node):
+        return self.binary(node, '-')
+
+    def visit_Mul(self, node):
+        return self.binary(node, '*')
+
+    def visit_Div(self, node):
+        return self.binary(node, '//')
+
+    def visit_Equal(self, node):
+        return self.binary(node, '==')
+
+    def visit_NotEqual(self, node):
+        return self.binary(node, '!=')
+
+    def visit_GreaterThan(self, node):
+        return self.binary(node, '>')
+
+    def visit_GreaterOrEqualThan(self, node):
+        return self.binary(node, '>=')
+
+    def visit_LessThan(self, node):
+        return self.binary(node, '<')
+
+    def visit_LessOrEqualThan(self, node):
+        return self.binary(node, '<=')
+
+    # Statements
+
+    def visit_Print(self, node):
+        parts = []
+        for i in node.operand:
+            if isinstance(i, (Num, String)):
+                parts.append(repr(str(i.value)))
+            else:
+                parts.append('str({})'.format(self.visit(i)))
+        if not parts:
+            return ["print('')"]
+        if len(parts) == 1:
+            return ['print({})'.format(parts[0])]
+        return ["print(''.join(({})))".format(', '.join(parts))]
+
+    def visit_If(self, node):
+        return (['if {}:'.format(self.visit(node.left))] +
+                ['    ' + text for text in self.visit(node.right)])
+
+    def visit_Let(self, node):
+        if isinstance(node.left, Index):
+            return ['set_element({!r}, {}, {})'.format(
+                node.left.left.value, self.visit(node.left.right),
+                self.visit(node.right))]
+        name = node.left.value
+        self.names.add(name)
+        return ['{} = {}'.format(name, self.visit(node.right))]
+
+    visit_Assign = visit_Let
+
+    def visit_Goto(self, node):
+        return self.target(node) + ['continue']
+
+    def visit_Gosub(self, node):
+        depth = self.machine.max_gosub_depth
+        return (['if len(stack) >= {}:'.format(depth),
+                 '    raise BasicRuntimeError({!r})'.format(
+                     'GOSUB nested more than {} deep'.format(depth))] +
+                self.target(node) +
+                ['stack.append({})'.format(self.index + 1),
+                 'continue'])
+
+    def visit_Return(self, node):
+        return ['if not stack:',
+                "    raise BasicRuntimeError('RETURN without GOSUB')",
+                'pc = stack.pop()',
+                'continue']
+
+    def visit_End(self, node):
+        return ['return']
+
+    def visit_Nop(self, node):
+        return ['pass']
+
+
+class PythonEvaluator(Evaluator):
+    '''
+    Evaluator that transpiles the stored program into one Python
+    function when it is loaded and runs the program by calling it.
+    The generated code is kept in source for inspection. Runs that
+    start on a line the function has no entry for (an immediate GOTO
+    into the middle of a block) fall back to the tree walker.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.source = ''
+        self.function = None
+
+    def load(self):
+        version = self.version
+        super().load()
+        if self.version == version:
+            return
+        transpiler = Transpiler(self)
+        self.source, self.line_map = transpiler.transpile()
+        self.entries = set(transpiler.labels())
+        namespace = {'variables': self.slots,
+                     'stack': self.gosub_stack,
+                     'position': self.position,
+                     'visit': self.visit,
+                     'print': self.write_line,
+                     'element': self.element,
+                     'set_element': self.set_element,
+                     'nodes': transpiler.nodes,
+                     'BasicRuntimeError': BasicRuntimeError}
+        exec(compile(self.source, FILENAME, 'exec'), namespace)
+        self.function = namespace['basic_program']
+
+    def execute(self, pc):
+        if pc < len(self.statements) and pc not in self.entries:
+            return super().execute(pc)
+        self.running = True
+        try:
+            self.function(pc)
+        except BasicRuntimeError as e:
+            if e.line is None:
+                e.line = self.error_line(e.__traceback__)
+            raise
+        except ZeroDivisionError as e:
+            raise BasicRuntimeError('Division by zero',
+                                    self.error_line(e.__traceback__)) \
+                from None
+        finally:
+            self.running = False
+
+    def error_line(self, tb):
+        'BASIC line of the innermost generated frame in traceback tb'
+        number = None
+        while tb is not None:
+            if tb.tb_frame.f_code.co_filename == FILENAME:
+                number = self.line_map[tb.tb_lineno - 1]
+            tb = tb.tb_next
+        return number
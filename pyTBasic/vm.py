@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+
+from array import array
+from bisect import bisect_right
+from functools import partial
+from pyTBasic.basic_types import (Equal, Goto, GreaterOrEqualThan,
+                                  GreaterThan, Index, LessOrEqualThan,
+                                  LessThan, NotEqual, Num)
+from pyTBasic.evaluator import BasicRuntimeError, Evaluator, NodeVisitor
+
+# Opcodes. Every instruction is an (opcode, argument) pair of ints.
+LOAD = 0            # Push variable slot arg
+PUSH_INT = 1        # Push arg
+STORE = 2           # Pop into variable slot arg
+ADD = 3             # Pop b, pop a, push a op b
+SUB = 4
+MUL = 5
+DIV = 6
+ADD_INT = 7         # Replace top of stack a with a op arg
+SUB_INT = 8
+MUL_INT = 9
+DIV_INT = 10
+JUMP = 11           # Jump to address arg
+JUMP_IF_EQ = 12     # Pop b, pop a, jump to address arg if a relop b
+JUMP_IF_NE = 13
+JUMP_IF_GT = 14
+JUMP_IF_GE = 15
+JUMP_IF_LT = 16
+JUMP_IF_LE = 17
+PUSH_CONST = 18     # Push consts[arg]
+PRINT = 19          # Pop arg values and print them
+GOTO = 20           # Pop a line number and jump to it
+GOSUB = 21          # Call line position arg (or a popped line number if -1)
+RETURN = 22
+END = 23
+VISIT = 24          # Run consts[arg] through the visitor
+LOAD_ELEMENT = 25   # Replace top of stack i with consts[arg](i)
+STORE_ELEMENT = 26  # Pop value, pop i, store value in consts[arg](i)
+
+INT_OPS = {ADD: ADD_INT, SUB: SUB_INT, MUL: MUL_INT, DIV: DIV_INT}
+
+# Relop -> (branch taken when true, branch taken when false)
+BRANCHES = {
+    Equal: (JUMP_IF_EQ, JUMP_IF_NE),
+    NotEqual: (JUMP_IF_NE, JUMP_IF_EQ),
+    GreaterThan: (JUMP_IF_GT, JUMP_IF_LE),
+    GreaterOrEqualThan: (JUMP_IF_GE, JUMP_IF_LT),
+    LessThan: (JUMP_IF_LT, JUMP_IF_GE),
+    LessOrEqualThan: (JUMP_IF_LE, JUMP_IF_GT),
+}
+
+
+class Assembler(NodeVisitor):
+    '''
+    Lowers statements into a flat stack machine instruction stream kept
+    in an int array. Constant jump targets are emitted as positions in
+    the statement list and patched to instruction addresses by finish(),
+    once every line has been assembled. Nodes without a visit_ method
+    are stored in the constant pool and run through the visitor.
+    '''
+
+    def __init__(self, machine):
+        self.machine = machine
+        self.code = array('i')
+        self.consts = []
+        self.fixups = []            # Addresses of args holding positions
+
+    def emit(self, op, arg=0):
+        self.code.append(op)
+        self.code.append(arg)
+
+    def const(self, value):
+        self.consts.append(value)
+        return len(self.consts) - 1
+
+    def assemble(self, statement):
+        'Assemble one line, returning its start address'
+        address = len(self.code)
+        self.visit(statement)
+        return address
+
+    def finish(self, line_starts):
+        '''
+        Terminate the stream and patch jump targets. line_starts holds
+        the start address of every line, followed by the END address.
+        '''
+        line_starts.append(len(self.code))
+        self.emit(END)
+        for address in self.fixups:
+            self.code[address] = line_starts[self.code[address]]
+
+    def generic_visit(self, node):
+        self.emit(VISIT, self.const(node))
+
+    # Expressions
+
+    def visit_String(self, node):
+        self.emit(PUSH_CONST, self.const(node.value))
+
+    def visit_Num(self, node):
+        if self.small_int(node):
+            self.emit(PUSH_INT, node.value)
+        else:
+            self.emit(PUSH_CONST, self.const(node.value))
+
+    def small_int(self, node):
+        'Does node hold a constant that fits in an instruction argument?'
+        return isinstance(node, Num) and isinstance(node.value, int) \
+            and -2**31 <= node.value < 2**31
+
+    def visit_Index(self, node):
+        self.visit(node.right)
+        self.emit(LOAD_ELEMENT, self.const(node.left.value))
+
+    def visit_Var(self, node):
+        self.emit(LOAD, node.slot)
+
+    def visit_Neg(self, node):
+        self.visit(node.operand)
+        self.emit(MUL_INT, -1)
+
+    def binary(self, node, op):
+        self.visit(node.left)
+        if self.small_int(node.right):
+            self.emit(INT_OPS[op], node.right.value)
+        else:
+            self.visit(node.right)
+            self.emit(op)
+
+    def visit_Add(self, node):
+        self.binary(node, ADD)
+
+    def visit_Sub(self, node):
+        self.binary(node, SUB)
+
+    def visit_Mul(self, node):
+        self.binary(node, MUL)
+
+    def visit_Div(self, node):
+        self.binary(node, DIV)
+
+    # Statements
+
+    def visit_Print(self, node):
+        for i in node.operand:
+            self.visit(i)
+        self.emit(PRINT, len(node.operand))
+
+    def visit_If(self, node):
+        branches = BRANCHES.get(type(node.left))
+        if branches is None:
+            return self.generic_visit(node)
+        self.visit(node.left.left)
+        self.visit(node.left.right)
+        target = self.machine.target_position(node.right)
+        if isinstance(node.right, Goto) and target is not None:
+            # IF ... THEN GOTO n is a single conditional jump
+            self.emit(branches[0], target)
+            self.fixups.append(len(self.code) - 1)
+            return
+        self.emit(branches[1])
+        skip = len(self.code) - 1
+        self.visit(node.right)
+        self.code[skip] = len(self.code)
+
+    def visit_Let(self, node):
+        if isinstance(node.left, Index):
+            self.visit(node.left.right)
+            self.visit(node.right)
+            self.emit(STORE_ELEMENT, self.const(node.left.left.value))
+            return
+        self.visit(node.right)
+        self.emit(STORE, node.left.slot)
+
+    visit_Assign = visit_Let
+
+    def visit_Goto(self, node):
+        target = self.machine.target_position(node)
+        if target is None:
+            self.visit(node.operand)
+            self.emit(GOTO)
+        else:
+            self.emit(JUMP, target)
+            self.fixups.append(len(self.code) - 1)
+
+    def visit_Gosub(self, node):
+        target = self.machine.target_position(node)
+        if target is None:
+            self.visit(node.operand)
+            self.emit(GOSUB, -1)
+        else:
+            self.emit(GOSUB, target)
+
+    def visit_Return(self, node):
+        self.emit(RETURN)
+
+    def visit_End(self, node):
+        self.emit(END)
+
+    def visit_Nop(self, node):
+        pass
+
+
+class VMEvaluator(Evaluator):
+    '''
+    Evaluator that assembles the stored program into bytecode when it
+    is loaded and runs it on a stack machine. LOAD and STORE index the
+    evaluator's variable slots directly.
+
+    Jumps are assembled to addresses, so any edit reassembles the
+    whole program.
+    '''
+    incremental = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.bytecode = array('i')
+        self.consts = []
+
+    def rebuild(self):
+        self.assembler = Assembler(self)
+        super().rebuild()
+        # self.code holds the start address of each line
+        self.assembler.finish(self.code)
+        self.bytecode = self.assembler.code
+        self.consts = self.assembler.consts
+        self.line_addresses = dict(zip(self.line_numbers, self.code))
+        del self.assembler
+
+    def compile_line(self, statement):
+        return self.assembler.assemble(statement)
+
+    def execute(self, pc):
+        self.running = True
+        try:
+            self.run(self.code[pc])
+        finally:
+            self.running = False
+
+    def callables(self):
+        # Profiled runs walk the tree, as self.code holds addresses
+        return [partial(self.visit, statement)
+                for statement in self.statements]
+
+    def run(self, pc):
+        code = self.bytecode
+        consts = self.consts
+        line_starts = self.code
+        gosub_stack = self.gosub_stack
+        slots = self.slots
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        try:
+            while True:
+                op = code[pc]
+                arg = code[pc + 1]
+                pc += 2
+                if op < ADD_INT:
+                    if op == LOAD:
+                        push(slots[arg])
+                    elif op == PUSH_INT:
+                        push(arg)
+                    elif op == STORE:
+                        slots[arg] = pop()
+                    else:
+                        b = pop()
+                        if op == ADD:
+                            stack[-1] = stack[-1] + b
+                        elif op == SUB:
+                            stack[-1] = stack[-1] - b
+                        elif op == MUL:
+                            stack[-1] = stack[-1] * b
+                        else:
+                            stack[-1] = stack[-1] // b
+                elif op < JUMP:
+                    if op == ADD_INT:
+                        stack[-1] = stack[-1] + arg
+                    elif op == SUB_INT:
+                        stack[-1] = stack[-1] - arg
+                    elif op == MUL_INT:
+                        stack[-1] = stack[-1] * arg
+                    else:
+                        stack[-1] = stack[-1] // arg
+                elif op == JUMP:
+                    pc = arg
+                elif op < PUSH_CONST:
+                    b = pop()
+                    a = pop()
+                    if op == JUMP_IF_LT:
+                        if a < b:
+                            pc = arg
+                    elif op == JUMP_IF_GE:
+                        if a >= b:
+                            pc = arg
+                    elif op == JUMP_IF_EQ:
+                        if a == b:
+                            pc = arg
+                    elif op == JUMP_IF_NE:
+                        if a != b:
+                            pc = arg
+                    elif op == JUMP_IF_GT:
+                        if a > b:
+                            pc = arg
+                    elif a <= b:
+                        pc = arg
+                elif op == PUSH_CONST:
+                    push(consts[arg])
+                elif op == PRINT:
+                    if arg:
+                        values = stack[-arg:]
+                        del stack[-arg:]
+                    else:
+                        values = ()
+                    self.output.write_line(''.join([str(value)
+                                                    for value in values]))
+                elif op == GOTO:
+                    pc = self.address(pop())
+                elif op == GOSUB:
+                    if len(gosub_stack) >= self.max_gosub_depth:
+                        raise BasicRuntimeError(
+                            'GOSUB nested more than {} deep'
+                            .format(self.max_gosub_depth))
+                    if arg < 0:
+                        target = self.address(pop())
+                    else:
+                        target = line_starts[arg]
+                    # Return to the line after this one
+                    gosub_stack.append(bisect_right(line_starts, pc - 2))
+                    pc = target
+                elif op == RETURN:
+                    if not gosub_stack:
+                        raise BasicRuntimeError('RETURN without GOSUB')
+                    pc = line_starts[gosub_stack.pop()]
+                elif op == END:
+                    return
+                elif op == VISIT:
+                    self.visit(consts[arg])
+                elif op == LOAD_ELEMENT:
+                    stack[-1] = self.element(consts[arg], stack[-1])
+                elif op == STORE_ELEMENT:
+                    value = pop()
+                    self.set_element(consts[arg], pop(), value)
+        except BasicRuntimeError as e:
+            if e.line is None:
+                e.line = self.line_numbers[
+                    bisect_right(line_starts, pc - 2) - 1]
+            raise
+        except ZeroDivisionError:
+            raise BasicRuntimeError('Division by zero', self.line_numbers[
+                bisect_right(line_starts, pc - 2) - 1]) from None
+
+    def address(self, number):
+        'Start address of line number'
+        address = self.line_addresses.get(number)
+        if address is None:
+            raise BasicRuntimeError('Undefined line {}'.format(number))
+        return address
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+import unittest
+from pyTBasic import parser
+from pyTBasic.basic_types import *
+
+
+class NodeTest(unittest.TestCase):
+    def setUp(self):
+        self.parser = parser.BasicParser()
+
+    def test_equal_leaves_are_shared(self):
+        first = self.parser.parse('10 LET I = I + 1')
+        second = self.parser.parse('20 LET I = I + 1')
+        self.assertIs(first.right.left, second.right.right.left)
+        self.assertIs(first.right.left, VARIABLES['I'])
+        self.assertIs(first.right.right.right, second.right.right.right)
+        self.assertIs(self.parser.parse('PRINT "A"').operand[0],
+                      self.parser.parse('PRINT "A", 1').operand[0])
+        self.assertEqual(first.right, second.right)
+        self.assertEqual(hash(first.right), hash(second.right))
+
+    def test_interning_optional(self):
+        b_parser = parser.BasicParser(intern=False)
+        first = b_parser.parse('PRINT 1')
+        second = b_parser.parse('PRINT 1')
+        self.assertIsNot(first.operand[0], second.operand[0])
+        self.assertEqual(first, second)
+
+    def test_interned_leaves_bounded(self):
+        max_leaves, parser.MAX_LEAVES = parser.MAX_LEAVES, 2
+        try:
+            for value in range(5):
+                self.parser.parse('PRINT {}'.format(value))
+        finally:
+            parser.MAX_LEAVES = max_leaves
+        self.assertLessEqual(len(self.parser.numbers), 2)
+
+    def test_structural_equality(self):
+        self.assertEqual(LineNum(Num(10), Goto(Num(20))),
+                         LineNum(Num(10), Goto(Num(20))))
+        self.assertNotEqual(Goto(Num(20)), Gosub(Num(20)))
+        self.assertNotEqual(Num(1), Num(True))
+        self.assertNotEqual(Num(1), 1)
+        cache = {self.parser.parse('PRINT X + 1'): 'compiled'}
+        self.assertEqual(cache[Print([Add(Var('X'), Num(1))])], 'compiled')
+
+    def test_immutable(self):
+        node = Num(1)
+        with self.assertRaises(AttributeError):
+            node.value = 2
+        with self.assertRaises(AttributeError):
+            del node.value
+        self.assertEqual(Input([Var('A')]).operand, (Var('A'),))
+
+
+if __name__ == '__main__':
+    unittest.main()
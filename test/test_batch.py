@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+from pyTBasic import batch, evaluator
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.write('a.bas', '10 LET A = 6 * 7\n20 PRINT A\n')
+        self.write('b.bas', '10 GOTO 10\n')
+        self.write('c.bas', '10 PRINT )\n')
+        self.write('notes.txt', 'not a program')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, text):
+        with open(os.path.join(self.directory.name, name), 'w') as f:
+            f.write(text)
+
+    def test_run_file(self):
+        record = batch.run_file(os.path.join(self.directory.name, 'a.bas'))
+        self.assertEqual((record['stdout'], record['status'], record['error'],
+                          record['steps']), ('42\n', 0, None, 2))
+
+    def test_run_batch(self):
+        paths = batch.find_programs(self.directory.name)
+        records = list(batch.run_batch(paths, 2,
+                                       limits=evaluator.Limits(max_steps=50)))
+        self.assertEqual([os.path.basename(r['program']) for r in records],
+                         ['a.bas', 'b.bas', 'c.bas'])
+        self.assertEqual([r['status'] for r in records], [0, 1, 1])
+        self.assertEqual(records[1]['steps'], 50)
+        self.assertTrue(records[2]['error'].startswith('SYNTAX ERROR'))
+
+    def test_failures_do_not_stop_batch(self):
+        self.write('d.bas', '10 PRINT 1/0\n')
+        self.write('e.bas', '10 LET X = "A"\n')
+        self.write('g.bas', '10 PRINT 5\n')
+        with open(os.path.join(self.directory.name, 'f.bas'), 'wb') as f:
+            f.write(b'10 PRINT "\xff"\n')
+        paths = [os.path.join(self.directory.name, name)
+                 for name in ('d.bas', 'e.bas', 'f.bas', 'g.bas')]
+        records = list(batch.run_batch(paths, 2))
+        self.assertEqual([r['status'] for r in records], [1, 1, 1, 0])
+        self.assertEqual(records[0]['error'],
+                         'RUNTIME ERROR Division by zero IN LINE 10')
+        self.assertTrue(records[1]['error'].startswith('SYNTAX ERROR'))
+        self.assertTrue(records[2]['error'].startswith('ERROR UnicodeDecode'))
+        self.assertEqual(records[3]['stdout'], '5\n')
+
+    def test_quit_ends_program(self):
+        self.write('d.bas', '10 PRINT "D"\n20 QUIT\n30 PRINT "X"\n')
+        paths = [os.path.join(self.directory.name, name)
+                 for name in ('a.bas', 'd.bas', 'c.bas')]
+        records = list(batch.run_batch(paths, 1))
+        self.assertEqual([r['status'] for r in records], [0, 0, 1])
+        self.assertEqual((records[1]['stdout'], records[1]['error']),
+                         ('D\n', None))
+
+    def test_default_limits(self):
+        self.write('d.bas', '10 LET A = 2\n20 LET A = A * A\n30 GOTO 20\n')
+        self.write('e.bas', '10 DIM A(4000000000)\n20 PRINT "X"\n')
+        paths = [os.path.join(self.directory.name, name)
+                 for name in ('d.bas', 'e.bas', 'a.bas')]
+        records = list(batch.run_batch(paths, 2))
+        self.assertEqual([r['status'] for r in records], [1, 1, 0])
+        self.assertEqual(records[0]['error'],
+                         'RUNTIME ERROR Value of A larger than 65536 bits '
+                         'IN LINE 20')
+        self.assertEqual(records[1]['error'],
+                         'RUNTIME ERROR Arrays larger than 1000000 elements '
+                         'IN LINE 10')
+        limits = batch.batch_limits(evaluator.Limits(max_steps=5,
+                                                     max_elements=7))
+        self.assertEqual(vars(limits),
+                         {'max_steps': 5, 'max_time': None,
+                          'max_int_bits': batch.MAX_INT_BITS,
+                          'max_string': None, 'max_elements': 7})
+
+    def test_default_time_limit(self):
+        max_time, batch.MAX_TIME = batch.MAX_TIME, 0.05
+        try:
+            record = batch.run_file(os.path.join(self.directory.name,
+                                                 'b.bas'))
+        finally:
+            batch.MAX_TIME = max_time
+        self.assertEqual(record['status'], 1)
+        self.assertTrue(record['error'].startswith('RUNTIME ERROR'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import unittest
+from pyTBasic import evaluator
+from test import test_evaluator
+
+
+class ControlFlowGraphTest(test_evaluator.EvaluatorFixture,
+                           unittest.TestCase):
+    def test_blocks(self):
+        self.execute('10 LET I = 0',
+                     '20 LET I = I + 1',
+                     '30 PRINT I',
+                     '40 IF I < 3 THEN GOTO 20',
+                     '50 GOSUB 80',
+                     '60 PRINT "DONE"',
+                     '70 END',
+                     '80 PRINT "SUB"',
+                     '90 RETURN')
+        cfg = self.evaluator.control_flow()
+        self.assertEqual([(block.start, block.end, block.successors)
+                          for block in cfg.blocks],
+                         [(0, 1, [1]), (1, 4, [1, 2]), (4, 5, [3, 4]),
+                          (5, 7, []), (7, 9, [])])
+        self.assertEqual(cfg.unreachable_lines(), [])
+
+    def test_unreachable_lines(self):
+        self.execute('10 GOTO 40',
+                     '20 PRINT "NEVER"',
+                     '30 PRINT "NOR THIS"',
+                     '40 GOSUB 70',
+                     '50 END',
+                     '60 PRINT "DEAD"',
+                     '70 RETURN')
+        self.assertEqual(self.evaluator.control_flow().unreachable_lines(),
+                         [20, 30, 60])
+        # A computed jump could go anywhere
+        self.execute('50 GOTO 10 * I')
+        self.assertEqual(self.evaluator.control_flow().unreachable_lines(),
+                         [])
+
+    def test_fused_units(self):
+        output = self.execute('10 LET I = 0',
+                              '20 LET I = I + 1',
+                              '30 PRINT I',
+                              '40 IF I < 2 THEN GOTO 20',
+                              '50 PRINT "END"',
+                              'RUN')
+        self.assertEqual(output, '1\n2\nEND\n')
+        self.assertEqual(self.evaluator.sizes[:5], [1, 3, 1, 1, 1])
+        loop = self.evaluator.units[1]
+        # A new jump into the middle of the loop splits its unit
+        output = self.execute('5 LET I = 0', '7 GOTO 30', 'RUN')
+        self.assertEqual(output, '0\n1\n2\nEND\n')
+        self.assertEqual([self.evaluator.sizes[i] for i in (0, 3, 4)],
+                         [2, 1, 2])
+        self.assertIsNot(self.evaluator.units[3], loop)
+
+    def test_error_line_in_unit(self):
+        with self.assertRaises(evaluator.BasicRuntimeError) as cm:
+            self.execute('10 PRINT "A"', '20 PRINT "B"', '30 RETURN',
+                         '40 PRINT "C"', 'RUN')
+        self.assertEqual(cm.exception.line, 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
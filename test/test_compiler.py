@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+
+import unittest
+from pyTBasic.compiler import ClosureEvaluator
+from test import test_evaluator
+
+
+class ClosureEvaluatorTest(test_evaluator.EvaluatorTest):
+    evaluator_class = ClosureEvaluator
+
+    def test_compiled_once_per_edit(self):
+        self.execute('10 PRINT "A"', '30 GOTO 50', '40 PRINT "C"',
+                     '50 PRINT "D"', 'RUN')
+        first, goto, _, last = code = list(self.evaluator.code)
+        self.execute('RUN')
+        self.assertEqual(self.evaluator.code, code)
+        # Only the edited lines are compiled again
+        output = self.execute('20 PRINT "B"', '45 PRINT "E"',
+                              '40 PRINT "F"', 'RUN')
+        self.assertEqual(output, 'A\nB\nD\n')
+        self.assertEqual(len(self.evaluator.code), 6)
+        self.assertIs(self.evaluator.code[0], first)
+        self.assertIs(self.evaluator.code[2], goto)
+        self.assertIsNot(self.evaluator.code[3], code[2])
+        self.assertIs(self.evaluator.code[5], last)
+        self.execute('20', '45')
+        self.assertEqual(self.execute('RUN'), 'A\nD\n')
+        self.assertIs(self.evaluator.code[1], goto)
+
+
+if __name__ == '__main__':
+    unittest.main()
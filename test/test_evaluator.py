@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from pyTBasic import evaluator, parser, profiler
+
+
+class EvaluatorFixture:
+    'Mixin giving a test a fresh evaluator and execute() to type lines in'
+    evaluator_class = evaluator.Evaluator
+
+    def setUp(self):
+        self.parser = parser.BasicParser()
+        self.evaluator = self.evaluator_class()
+        evaluator.line_num_table.clear()
+
+    def tearDown(self):
+        evaluator.line_num_table.clear()
+
+    def execute(self, *lines):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            for line in lines:
+                self.evaluator.visit(self.parser.parse(line))
+        return out.getvalue()
+
+
+class EvaluatorTest(EvaluatorFixture, unittest.TestCase):
+    def test_goto_loop(self):
+        output = self.execute('10 LET I = 1',
+                              '20 PRINT I',
+                              '30 LET I = I + 1',
+                              '40 IF I < 4 THEN GOTO 20',
+                              '50 PRINT "DONE"',
+                              'RUN')
+        self.assertEqual(output, '1\n2\n3\nDONE\n')
+
+    def test_computed_goto(self):
+        output = self.execute('10 LET X = 2',
+                              '20 GOTO 10 * X + 10',
+                              '30 PRINT "THIRTY"',
+                              '40 END',
+                              '50 PRINT "FIFTY"',
+                              'RUN')
+        self.assertEqual(output, 'THIRTY\n')
+
+    def test_end(self):
+        output = self.execute('10 PRINT "A"', '20 END', '30 PRINT "B"',
+                              'RUN')
+        self.assertEqual(output, 'A\n')
+
+    def test_quit(self):
+        with self.assertRaises(evaluator.QuitRequested):
+            self.execute('10 LET I = I + 1',
+                         '20 IF I = 100 THEN QUIT',
+                         '30 GOTO 10',
+                         'RUN')
+        self.assertEqual(self.evaluator.variables['I'], 100)
+        with self.assertRaises(evaluator.QuitRequested):
+            self.execute('QUIT')
+
+    def test_gosub_return(self):
+        output = self.execute('10 GOSUB 100',
+                              '20 GOSUB 100',
+                              '30 END',
+                              '100 PRINT "SUB"',
+                              '110 RETURN',
+                              'RUN')
+        self.assertEqual(output, 'SUB\nSUB\n')
+
+    def test_immediate_goto(self):
+        output = self.execute('10 PRINT "A"', '20 PRINT "B"', 'GOTO 20')
+        self.assertEqual(output, 'B\n')
+
+    def test_undefined_line(self):
+        with self.assertRaises(evaluator.BasicRuntimeError) as cm:
+            self.execute('10 GOTO 99', 'RUN')
+        self.assertEqual(cm.exception.line, 10)
+
+    def test_return_without_gosub(self):
+        with self.assertRaises(evaluator.BasicRuntimeError):
+            self.execute('10 RETURN', 'RUN')
+
+    def test_gosub_depth_limit(self):
+        self.evaluator.max_gosub_depth = 10
+        with self.assertRaises(evaluator.BasicRuntimeError) as cm:
+            self.execute('10 GOSUB 10', 'RUN')
+        self.assertEqual(cm.exception.line, 10)
+
+    def test_arithmetic(self):
+        output = self.execute('10 LET A = 7',
+                              '20 LET B = A * 3 - 4 / 2',
+                              '30 PRINT A, " ", B, " ", (A + B) / 2',
+                              '40 PRINT -7 / 2, " ", 2 - A * -1',
+                              '50 IF B - 1 >= 18 THEN PRINT "GE"',
+                              '60 IF A <> B THEN PRINT "NE"',
+                              'RUN')
+        self.assertEqual(output, '7 19 13\n-4 9\nGE\nNE\n')
+
+    def test_negation(self):
+        output = self.execute('10 LET X = 5',
+                              '20 LET Y = -X',
+                              '30 PRINT Y, " ", -(X + 1) * 2, " ", 3 - -X',
+                              '40 IF -Y > 4 THEN PRINT "GT"',
+                              'RUN')
+        self.assertEqual(output, '-5 -12 8\nGT\n')
+
+    def test_variable_slots(self):
+        self.evaluator.input = iter(['1'])
+        self.execute('10 LET Z = 26', '20 INPUT A', 'RUN')
+        self.assertEqual(self.evaluator.slots[0], 1)
+        self.assertEqual(self.evaluator.slots[25], 26)
+        self.assertEqual(self.evaluator.variables['Z'], 26)
+        self.evaluator.variables['Z'] = 3
+        self.assertEqual(self.execute('PRINT Z'), '3\n')
+
+    def test_division_by_zero(self):
+        for lines, line in [(('10 PRINT 1 / 0',), 10),
+                            (('10 LET A = 0', '20 LET B = 7 / A'), 20),
+                            (('10 LET A = 0', '20 PRINT "X"',
+                              '30 IF 1 / A = 0 THEN END'), 30)]:
+            evaluator.line_num_table.clear()
+            with self.assertRaises(evaluator.BasicRuntimeError) as cm:
+                self.execute(*lines, 'RUN')
+            self.assertEqual(cm.exception.line, line)
+        with self.assertRaises(evaluator.BasicRuntimeError):
+            self.execute('PRINT 1 / 0')
+
+    def test_edit_between_runs(self):
+        output = self.execute('10 GOTO 30', '20 PRINT "A"', '30 PRINT "B"',
+                              'RUN', '10 PRINT "C"', 'RUN')
+        self.assertEqual(output, 'B\nC\nA\nB\n')
+
+    def test_insert_and_delete_between_runs(self):
+        output = self.execute('10 LET I = 0',
+                              '20 LET I = I + 1',
+                              '40 IF I < 3 THEN GOTO 20',
+                              '50 PRINT I',
+                              'RUN',
+                              '15 PRINT "X"',
+                              '30 PRINT I',
+                              'RUN',
+                              '15',
+                              'RUN')
+        self.assertEqual(output, '3\nX\n1\n2\n3\n3\n1\n2\n3\n3\n')
+
+    def test_input(self):
+        self.evaluator.input = iter(['3', '4'])
+        output = self.execute('10 INPUT A, B', '20 PRINT A + B', 'RUN')
+        self.assertEqual(output, '7\n')
+        with self.assertRaises(evaluator.BasicRuntimeError) as cm:
+            self.execute('RUN')
+        self.assertEqual(cm.exception.line, 10)
+
+    def test_arrays(self):
+        output = self.execute('10 DIM A(5), B(2)',
+                              '20 LET I = 0',
+                              '30 LET A(I) = I * I',
+                              '40 LET I = I + 1',
+                              '50 IF I <= 5 THEN GOTO 30',
+                              '60 LET B(A(1) + 1) = A(5) - A(4)',
+                              '70 PRINT A(3), " ", B(0), " ", B(2)',
+                              'RUN')
+        self.assertEqual(output, '9 0 9\n')
+        self.assertEqual(self.evaluator.arrays['A'].typecode, 'q')
+
+    def test_array_errors(self):
+        for lines, line in [(('10 DIM A(3)', '20 PRINT A(4)'), 20),
+                            (('10 DIM A(3)', '20 LET A(-1) = 1'), 20),
+                            (('10 PRINT Z(1)',), 10),
+                            (('10 DIM A(-2)',), 10),
+                            (('10 DIM A(1)', '20 LET X = 4294967296',
+                              '30 LET A(0) = X * X'), 30)]:
+            evaluator.line_num_table.clear()
+            with self.assertRaises(evaluator.BasicRuntimeError) as cm:
+                self.execute(*lines, 'RUN')
+            self.assertEqual(cm.exception.line, line)
+
+    def test_unchecked_bounds(self):
+        self.evaluator.check_bounds = False
+        output = self.execute('10 DIM A(3)', '20 LET A(3) = 7',
+                              '30 PRINT A(-1)', 'RUN')
+        self.assertEqual(output, '7\n')
+
+    def test_profile(self):
+        self.evaluator.profiler = profiler.LineProfiler()
+        output = self.execute('10 LET I = 0',
+                              '20 GOSUB 100',
+                              '30 IF I < 3 THEN GOTO 20',
+                              '40 END',
+                              '100 LET I = I + 1',
+                              '110 RETURN',
+                              'RUN')
+        self.assertIn('HOTTEST LINES', output)
+        self.assertEqual(
+            sorted((number, hits) for number, hits, _
+                   in self.evaluator.profiler.lines()),
+            [(10, 1), (20, 3), (30, 3), (40, 1), (100, 3), (110, 3)])
+
+    def test_profile_statement(self):
+        output = self.execute('10 PRINT "A"', 'PROFILE', 'RUN')
+        self.assertTrue(output.startswith('A\nHOTTEST LINES\n'))
+        self.assertTrue(output.endswith('\nA\n'))
+        self.assertIsNone(self.evaluator.profiler)
+
+    def assertLimit(self, limits, line, *lines):
+        self.evaluator.limits = limits
+        with self.assertRaises(evaluator.LimitExceeded) as cm:
+            self.execute(*lines)
+        self.assertEqual(cm.exception.line, line)
+
+    def test_step_limit(self):
+        self.assertLimit(evaluator.Limits(max_steps=100), 10,
+                         '10 GOTO 10', 'RUN')
+        self.assertLimit(evaluator.Limits(max_steps=100), 20,
+                         '20 GOTO 20', 'GOTO 20')
+
+    def test_time_limit(self):
+        self.assertLimit(evaluator.Limits(max_time=0.05), 10,
+                         '10 GOTO 10', 'RUN')
+
+    def test_int_limit(self):
+        self.assertLimit(evaluator.Limits(max_int_bits=64), 20,
+                         '10 LET A = 2', '20 LET A = A * A', '30 GOTO 20',
+                         'RUN')
+
+    def test_string_limit(self):
+        self.assertLimit(evaluator.Limits(max_string=3), 20,
+                         '10 PRINT "ABC"', '20 PRINT "ABCD"', 'RUN')
+
+    def test_array_limit(self):
+        self.assertLimit(evaluator.Limits(max_elements=10), 10,
+                         '10 DIM A(4294967296)', 'RUN')
+        self.assertNotIn('A', self.evaluator.arrays)
+        self.assertLimit(evaluator.Limits(max_elements=10), 20,
+                         '10 DIM A(4), B(4)', '20 DIM C(0)', 'RUN')
+        self.evaluator.limits = evaluator.Limits(max_elements=10)
+        self.assertEqual(self.execute('DIM A(4)', 'DIM A(4)', 'PRINT A(4)'),
+                         '0\n')
+
+    def test_within_limits(self):
+        self.evaluator.limits = evaluator.Limits(10, 10.0, 64, 10)
+        self.assertEqual(self.execute('10 LET A = 3', '20 PRINT "A", A * A',
+                                      'RUN'), 'A9\n')
+
+
+class NodeVisitorTest(unittest.TestCase):
+    def test_dispatch_per_class(self):
+        class Doubler(evaluator.Evaluator):
+            def visit_Num(self, node):
+                return node.value * 2
+
+        node = parser.BasicParser().parse('PRINT 1')
+        self.assertEqual(evaluator.Evaluator().visit(node.operand[0]), 1)
+        self.assertEqual(Doubler().visit(node.operand[0]), 2)
+        self.assertEqual(evaluator.Evaluator().visit(node.operand[0]), 1)
+
+    def test_generic_visit(self):
+        with self.assertRaises(RuntimeError):
+            evaluator.PrintParseTree().visit(object())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+import io
+import threading
+import unittest
+from contextlib import redirect_stdout
+from pyTBasic import evaluator
+from pyTBasic.compiler import ClosureEvaluator
+from pyTBasic.interpreter import Interpreter
+from pyTBasic.transpiler import PythonEvaluator
+from pyTBasic.vm import VMEvaluator
+
+PROGRAM = '''\
+10 INPUT N
+20 LET S = 0
+30 LET I = 1
+40 LET S = S + I
+50 LET I = I + 1
+60 IF I <= N THEN GOTO 40
+70 PRINT "SUM ", S
+'''
+
+
+class InterpreterTest(unittest.TestCase):
+    def test_run(self):
+        for evaluator_class in (evaluator.Evaluator, ClosureEvaluator,
+                                PythonEvaluator, VMEvaluator):
+            out = io.StringIO()
+            with redirect_stdout(out):
+                output = Interpreter(evaluator_class).run(PROGRAM, ['10'])
+            self.assertEqual(output, 'SUM 55\n')
+            self.assertEqual(out.getvalue(), '')
+
+    def test_no_shared_state(self):
+        first, second = Interpreter(), Interpreter()
+        first.execute('10 LET A = 1')
+        first.execute('RUN')
+        self.assertEqual(len(second.program), 0)
+        self.assertEqual(second.variables['A'], 0)
+        self.assertNotIn(10, evaluator.line_num_table)
+
+    def test_run_resets_variables(self):
+        interpreter = Interpreter()
+        interpreter.run('10 LET A = A + 1\n20 PRINT A')
+        self.assertEqual(interpreter.run('10 LET A = A + 1\n20 PRINT A'),
+                         '1\n')
+
+    def test_threads(self):
+        results = {}
+
+        def run(n):
+            results[n] = Interpreter().run(PROGRAM, [str(n)])
+
+        threads = [threading.Thread(target=run, args=(n,))
+                   for n in range(1, 200, 10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, {n: 'SUM {}\n'.format(n * (n + 1) // 2)
+                                   for n in range(1, 200, 10)})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+import unittest
+from pyTBasic import evaluator
+from pyTBasic.jit import JITEvaluator
+from test import test_evaluator
+
+
+class JITEvaluatorTest(test_evaluator.EvaluatorTest):
+    evaluator_class = JITEvaluator
+
+    def setUp(self):
+        super().setUp()
+        # Compile every loop on its second time round
+        self.evaluator.threshold = 1
+
+    def test_loop_traced(self):
+        output = self.execute('10 LET I = 0',
+                              '20 LET S = 0',
+                              '30 LET S = S + I',
+                              '40 LET I = I + 1',
+                              '50 IF I < 100 THEN GOTO 30',
+                              '60 PRINT S, " ", I',
+                              'RUN')
+        self.assertEqual(output, '4950 100\n')
+        trace = self.evaluator.traces[2, 4]
+        self.assertIn('S = (S + I)', trace.source)
+
+    def test_guard_exit(self):
+        output = self.execute('10 LET I = 0',
+                              '20 LET I = I + 1',
+                              '30 IF I = 10 THEN GOTO 60',
+                              '40 IF I > 3 THEN PRINT I',
+                              '50 GOTO 20',
+                              '60 PRINT "DONE"',
+                              'RUN')
+        self.assertEqual(output, '4\n5\n6\n7\n8\n9\nDONE\n')
+        self.assertIsNotNone(self.evaluator.traces[1, 4])
+
+    def test_untraceable_loop(self):
+        output = self.execute('10 LET I = 0',
+                              '20 GOSUB 100',
+                              '30 IF I < 5 THEN GOTO 20',
+                              '40 END',
+                              '100 LET I = I + 1',
+                              '110 RETURN',
+                              'RUN')
+        self.assertEqual(output, '')
+        self.assertEqual(self.evaluator.variables['I'], 5)
+        self.assertIsNone(self.evaluator.traces[1, 2])
+
+    def test_error_in_trace(self):
+        with self.assertRaises(evaluator.BasicRuntimeError) as cm:
+            self.execute('10 DIM A(5)',
+                         '20 LET I = 0',
+                         '30 LET A(I) = I',
+                         '40 LET I = I + 1',
+                         '50 GOTO 30',
+                         'RUN')
+        self.assertEqual(cm.exception.line, 30)
+        self.assertEqual(self.evaluator.variables['I'], 6)
+
+    def test_edit_drops_traces(self):
+        self.execute('10 LET I = 0', '20 LET I = I + 1',
+                     '30 IF I < 5 THEN GOTO 20', 'RUN')
+        self.assertTrue(self.evaluator.traces)
+        self.execute('30 IF I < 9 THEN GOTO 20', 'RUN')
+        self.assertEqual(self.evaluator.variables['I'], 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+from pyTBasic import loader, parser
+from pyTBasic.basic_types import VARIABLES
+from pyTBasic.program import Program
+
+
+class LoaderTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.bas')
+        os.close(fd)
+
+    def tearDown(self):
+        for path in (self.path, self.path + loader.CACHE_SUFFIX):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def write(self, text):
+        with open(self.path, 'w') as f:
+            f.write(text)
+
+    def test_load(self):
+        self.write('20 print "b"\n\n10 let a = 1\r\n30 goto 10')
+        program = loader.load_program(self.path, Program())
+        self.assertEqual(program.numbers(), [10, 20, 30])
+        self.assertEqual(str(program[20]), '20 PRINT B')
+
+    def test_replaced_and_deleted_lines(self):
+        self.write('10 PRINT 1\n20 PRINT 2\n10 PRINT 3\n20\n')
+        program = loader.load_program(self.path, Program())
+        self.assertEqual(program.numbers(), [10])
+        self.assertEqual(str(program[10]), '10 PRINT 3')
+
+    def test_syntax_error_line(self):
+        self.write('10 PRINT 1\n20 GOTO\n')
+        with self.assertRaises(SyntaxError) as cm:
+            loader.read_program(self.path)
+        self.assertEqual(cm.exception.lineno, 2)
+        self.assertEqual(cm.exception.filename, self.path)
+
+    def test_unnumbered_line(self):
+        self.write('10 PRINT 1\nRUN\n')
+        with self.assertRaises(SyntaxError) as cm:
+            loader.read_program(self.path)
+        self.assertEqual(cm.exception.lineno, 2)
+
+    def test_trailing_garbage(self):
+        for text in ('10 GOTO 10 20\n', '10 PRINT 1 #\n', '10 PRINT "A\n'):
+            self.write(text)
+            with self.assertRaises(SyntaxError):
+                loader.read_program(self.path)
+
+    def test_cache_round_trip(self):
+        self.write('10 LET A = (B + 2) * -3\n20 IF A <> 1 THEN GOSUB 10\n'
+                   '30 PRINT "X", A, B\n40 INPUT A, B\n50 LIST 10\n')
+        parsed = loader.read_program(self.path)
+        self.assertTrue(os.path.exists(self.path + loader.CACHE_SUFFIX))
+        b_parser = parser.BasicParser()
+        with mock.patch.object(b_parser, 'parse_program',
+                               side_effect=AssertionError('parsed again')):
+            cached = loader.read_program(self.path, b_parser)
+        self.assertEqual(repr(cached), repr(parsed))
+
+    def test_cached_leaves_shared(self):
+        self.write('10 LET A = A + 1\n20 PRINT "X", A + 1\n30 PRINT "X"\n')
+        loader.read_program(self.path)
+        lines = loader.read_program(self.path, parser.BasicParser())
+        self.assertIs(lines[10].right.right.left, VARIABLES['A'])
+        self.assertIs(lines[10].right.right.right,
+                      lines[20].right.operand[1].right)
+        self.assertIs(lines[20].right.operand[0], lines[30].right.operand[0])
+
+    def test_cache_invalidated(self):
+        self.write('10 PRINT 1\n')
+        loader.read_program(self.path)
+        self.write('10 PRINT 2\n')
+        self.assertEqual(str(loader.read_program(self.path)[10]),
+                         '10 PRINT 2')
+
+    def test_corrupt_cache_ignored(self):
+        self.write('10 PRINT 1\n')
+        loader.read_program(self.path)
+        with open(self.path + loader.CACHE_SUFFIX, 'r+b') as f:
+            f.seek(-3, os.SEEK_END)
+            f.truncate()
+        self.assertEqual(str(loader.read_program(self.path)[10]),
+                         '10 PRINT 1')
+
+    def test_single_tokenizer_pass(self):
+        self.write('10 PRINT 1\n20 LET A = 2\n30 END\n')
+        tokenizer = mock.Mock(wraps=parser.compact_tokens)
+        lines = loader.read_program(self.path,
+                                    parser.BasicParser(tokenizer=tokenizer),
+                                    cache=False)
+        self.assertEqual(sorted(lines), [10, 20, 30])
+        tokenizer.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
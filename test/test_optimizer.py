@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+import io
+import unittest
+from contextlib import redirect_stdout
+from pyTBasic import evaluator, parser
+from pyTBasic.optimizer import Optimizer
+
+
+class OptimizerTest(unittest.TestCase):
+    def setUp(self):
+        self.parser = parser.BasicParser()
+        self.optimizer = Optimizer()
+
+    def optimize(self, text):
+        return repr(self.optimizer.optimize(self.parser.parse(text)))
+
+    def test_fold_constants(self):
+        self.assertEqual(self.optimize('PRINT ((4 + 2) / (7 + 5) - 2) * 3'),
+                         'Print([Num(-6)])')
+        self.assertEqual(len(self.optimizer.changes), 5)
+
+    def test_division_by_zero_not_folded(self):
+        self.assertEqual(self.optimize('PRINT 1 / 0'),
+                         'Print([Div(Num(1), Num(0))])')
+        self.assertEqual(self.optimizer.changes, [])
+
+    def test_identities(self):
+        self.assertEqual(self.optimize('LET X = (Y + 0) * 1 - 0'),
+                         'Let(Var(X), Var(Y))')
+        self.assertEqual(self.optimize('LET X = 1 * (0 + Y) / 1'),
+                         'Let(Var(X), Var(Y))')
+
+    def test_constant_if(self):
+        self.assertEqual(self.optimize('IF 2 > 1 THEN PRINT "YES"'),
+                         "Print([String(YES)])")
+        self.assertEqual(self.optimize('10 IF 1 = 2 THEN GOTO 10'),
+                         'LineNum(Num(10), Nop(IF 1 = 2 THEN Goto 10))')
+
+    def test_unchanged(self):
+        node = self.parser.parse('PRINT X + 1')
+        self.assertIs(self.optimizer.optimize(node), node)
+        self.assertEqual(self.optimizer.changes, [])
+
+    def test_same_output(self):
+        lines = ['10 LET A = 3 * 0 + 7',
+                 '20 IF 1 < 2 THEN PRINT A * (2 + 2)',
+                 '30 IF 2 < 1 THEN PRINT "NEVER"',
+                 '40 GOTO 10 * 5',
+                 '50 PRINT A / 1 - 0',
+                 'RUN']
+        outputs = []
+        for optimize in (False, True):
+            evaluator.line_num_table.clear()
+            b_evaluator = evaluator.Evaluator()
+            out = io.StringIO()
+            with redirect_stdout(out):
+                for line in lines:
+                    node = self.parser.parse(line)
+                    if optimize:
+                        node = self.optimizer.optimize(node)
+                    b_evaluator.visit(node)
+            outputs.append(out.getvalue())
+        evaluator.line_num_table.clear()
+        self.assertEqual(outputs[0], '28\n7\n')
+        self.assertEqual(outputs[0], outputs[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+import io
+import unittest
+from pyTBasic import output
+from pyTBasic.interpreter import Interpreter
+
+
+class SinkTest(unittest.TestCase):
+    def batches(self, policy, lines, size=10):
+        batches = []
+        sink = output.CallbackSink(batches.append, policy, size)
+        for line in lines:
+            sink.write_line(line)
+        return batches, sink
+
+    def test_line_policy(self):
+        batches, _ = self.batches(output.LINE, ['A', 'B'])
+        self.assertEqual(batches, ['A\n', 'B\n'])
+
+    def test_size_policy(self):
+        batches, sink = self.batches(output.SIZE, ['1234', '1234', '1', '1'])
+        self.assertEqual(batches, ['1234\n1234\n'])
+        sink.flush()
+        self.assertEqual(batches, ['1234\n1234\n', '1\n1\n'])
+
+    def test_end_policy(self):
+        batches, sink = self.batches(output.END, ['A'] * 100)
+        self.assertEqual(batches, [])
+        sink.flush()
+        self.assertEqual(batches, ['A\n' * 100])
+
+    def test_print_to_sink(self):
+        sink = output.BufferSink()
+        print('A', 1, file=sink)
+        self.assertEqual(sink.getvalue(), 'A 1\n')
+
+    def test_as_sink(self):
+        sink = output.BufferSink()
+        self.assertIs(output.as_sink(sink), sink)
+        f = io.StringIO()
+        output.as_sink(f).write_line('A')
+        self.assertEqual(f.getvalue(), 'A\n')
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            output.FileSink(policy='never')
+
+    def test_flushed_at_end_of_run(self):
+        f = io.StringIO()
+        interpreter = Interpreter(output=output.FileSink(f, output.END))
+        interpreter.load('10 PRINT "A"\n20 PRINT "B"\n')
+        interpreter.execute('RUN')
+        self.assertEqual(f.getvalue(), 'A\nB\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,7 +15,7 @@ class BasicParserTest(unittest.TestCase):
         test_expr3 = 'PRINT ((4 + 2) / (7 + 5) - 2) * 3'
         test_expr4 = 'PRINT 2 + 10 / (2 + 2)'
         expr_parsed1 = Print([Sub(Var('X'), (Mul(Num(-2), Num(2))))])
-        expr_parsed2 = Print([Sub(Add(Var('-X'), Var('Y')), Mul(Num(2), Num(2)))])
+        expr_parsed2 = Print([Sub(Add(Neg(Var('X')), Var('Y')), Mul(Num(2), Num(2)))])
         expr_parsed3 = Print([Mul(Sub(Div(Add(Num(4), Num(2)), Add(Num(7), Num(5))),
                                Num(2)), Num(3))])
         expr_parsed4 = Print([Add(Num(2), Div(Num(10), Add(Num(2), Num(2))))])
@@ -77,12 +77,12 @@ class BasicParserTest(unittest.TestCase):
         parsed_statement2 = If(GreaterThan(Var('X'), Num(2)),
                                Print([String('X > 2')]))
         parsed_statement3 = If(GreaterThan(Var('X'), Num(2)),
-                               Let(Assign(String('Y'), Num(3))))
+                               Let(Var('Y'), Num(3)))
         parsed_statement4 = If(NotEqual(Var('X'), Num(2)),
-                               Let(Assign(String('Y'), Num(3))))
+                               Let(Var('Y'), Num(3)))
         parsed_statement5 = If(NotEqual(Add(Var('X'), Num(2)),
                                         Sub(Num(2), Num(2))),
-                               Let(Assign(String('Y'), Num(3))))
+                               Let(Var('Y'), Num(3)))
 
         self.assertEqual(self.e.parse(if_statement1), parsed_statement1)
         self.assertEqual(self.e.parse(if_statement2), parsed_statement2)
@@ -131,8 +131,8 @@ class BasicParserTest(unittest.TestCase):
         let_statement2 = 'LET X = -3'
         let_statement3 = 'LET X'
         let_statement4 = 'LET X ='
-        parsed_let1 = Let(Assign(String('X'), Num(3)))
-        parsed_let2 = Let(Assign(String('X'), Num(-3)))
+        parsed_let1 = Let(Var('X'), Num(3))
+        parsed_let2 = Let(Var('X'), Num(-3))
 
         self.assertEqual(self.e.parse(let_statement1), parsed_let1)
         self.assertEqual(self.e.parse(let_statement2), parsed_let2)
@@ -162,6 +162,12 @@ class BasicParserTest(unittest.TestCase):
         self.assertEqual(self.e.parse(return_statement1), parsed_return1)
         self.assertEqual(self.e.parse(return_statement2), parsed_return2)
 
+    def test_quit_statement(self):
+        self.assertEqual(self.e.parse('QUIT'), Quit(None))
+        self.assertEqual(self.e.parse('10 IF X = 1 THEN QUIT'),
+                         LineNum(Num(10), If(Equal(Var('X'), Num(1)),
+                                             Quit(None))))
+
     def test_list_statement(self):
         list_statement1 = 'LIST'
         list_statement2 = 'LIST 20'
@@ -175,6 +181,85 @@ class BasicParserTest(unittest.TestCase):
         with self.assertRaises(SyntaxError):
             self.e.parse(list_statement_invalid)
 
+    def test_dim_statement(self):
+        self.assertEqual(repr(self.e.parse('DIM A(10), B(N + 1)')),
+                         'Dim([Index(String(A), Num(10)), '
+                         'Index(String(B), Add(Var(N), Num(1)))])')
+        self.assertEqual(repr(self.e.parse('LET A(I) = A(I - 1)')),
+                         'Let(Index(String(A), Var(I)), '
+                         'Index(String(A), Sub(Var(I), Num(1))))')
+        for statement in ('DIM', 'DIM A', 'DIM A(', 'DIM A(1) B(2)',
+                          'LET A() = 1'):
+            with self.assertRaises(SyntaxError):
+                self.e.parse(statement)
+
+    def test_missing_expression(self):
+        for statement in ('LET X = "A"', 'PRINT 1 + "A"', 'PRINT 2 * "A"',
+                          'PRINT ()', 'IF X = 1 THEN "A"',
+                          'IF "A" = 1 THEN END', 'GOTO "A"', '10 "A"'):
+            with self.assertRaises(SyntaxError) as cm:
+                self.e.parse(statement)
+            self.assertEqual(str(cm.exception), 'Expected EXPRESSION')
+
+
+class TokenArraysTest(unittest.TestCase):
+    def test_compact_tokens(self):
+        tokens = parser.compact_tokens('10 PRINT "A", B\n')
+        self.assertEqual(list(tokens.types),
+                         [parser.T_NUM, parser.T_KWORD, parser.T_STRNG,
+                          parser.T_COM, parser.T_VAR, parser.T_NL])
+        self.assertEqual(tokens.value(2), '"A"')
+        self.assertEqual(list(tokens.tokens()),
+                         list(parser.generate_tokens('10 PRINT "A", B\n')))
+
+    def test_error_token(self):
+        tokens = parser.compact_tokens('PRINT #')
+        self.assertEqual(tokens.types[-1], parser.T_ERROR)
+        self.assertEqual(tokens.value(len(tokens) - 1), '#')
+
+    def test_dangling_divide(self):
+        with self.assertRaises(SyntaxError):
+            parser.BasicParser().parse('PRINT A /')
+
+
+class ParseCacheTest(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = parser.ParseCache()
+        b_parser = parser.BasicParser(cache)
+        first = b_parser.parse('PRINT X + 1')
+        self.assertIs(b_parser.parse('  PRINT   X + 1 '), first)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_string_whitespace_kept(self):
+        cache = parser.ParseCache()
+        b_parser = parser.BasicParser(cache)
+        b_parser.parse('PRINT "A  B"')
+        b_parser.parse('PRINT "A B"')
+        self.assertEqual(len(cache), 2)
+
+    def test_shared_between_parsers(self):
+        cache = parser.ParseCache()
+        first = parser.BasicParser(cache).parse('GOTO 10')
+        self.assertIs(parser.BasicParser(cache).parse('GOTO 10'), first)
+
+    def test_evicts_least_recently_used(self):
+        cache = parser.ParseCache(maxsize=2)
+        b_parser = parser.BasicParser(cache)
+        a = b_parser.parse('PRINT 1')
+        b_parser.parse('PRINT 2')
+        b_parser.parse('PRINT 1')
+        b_parser.parse('PRINT 3')
+        self.assertEqual(len(cache), 2)
+        self.assertIs(b_parser.parse('PRINT 1'), a)
+        b_parser.parse('PRINT 2')
+        self.assertEqual(cache.misses, 4)
+
+    def test_syntax_error_not_cached(self):
+        cache = parser.ParseCache()
+        with self.assertRaises(SyntaxError):
+            parser.BasicParser(cache).parse('GOTO')
+        self.assertEqual(len(cache), 0)
+
 
 if __name__ == '__main__':
     unittest.main()
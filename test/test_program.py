@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+import unittest
+from pyTBasic.program import Program
+from test import test_evaluator
+
+
+class ProgramTest(unittest.TestCase):
+    def setUp(self):
+        self.p = Program()
+
+    def test_ordered_iteration(self):
+        for number in (30, 10, 20, 5):
+            self.p[number] = 'line %d' % number
+        self.assertEqual(self.p.numbers(), [5, 10, 20, 30])
+        self.assertEqual(list(self.p), ['line 5', 'line 10', 'line 20',
+                                        'line 30'])
+
+    def test_replace(self):
+        self.p[10] = 'old'
+        self.p[10] = 'new'
+        self.assertEqual(len(self.p), 1)
+        self.assertEqual(list(self.p), ['new'])
+
+    def test_delete(self):
+        for number in (10, 20, 30):
+            self.p[number] = number
+        del self.p[20]
+        self.assertNotIn(20, self.p)
+        self.assertEqual(list(self.p), [10, 30])
+        with self.assertRaises(KeyError):
+            del self.p[20]
+
+    def test_edits_since(self):
+        self.p.update({10: 'a', 20: 'b'})
+        version = self.p.version
+        self.assertEqual(self.p.edits_since(version), [])
+        self.p[30] = 'c'
+        self.p[10] = 'd'
+        del self.p[20]
+        self.assertEqual(self.p.edits_since(version), [30, 10, 20])
+        self.assertEqual(self.p.edits_since(version + 2), [20])
+        self.assertIsNone(self.p.edits_since(version - 1))
+        self.p.clear()
+        self.assertIsNone(self.p.edits_since(version))
+
+    def test_from_line(self):
+        for number in (10, 20, 30):
+            self.p[number] = number
+        self.assertEqual(list(self.p.from_line(20)), [20, 30])
+        self.assertEqual(list(self.p.from_line(15)), [20, 30])
+        self.assertEqual(list(self.p.from_line(31)), [])
+
+
+class ProgramStoreTest(test_evaluator.EvaluatorFixture, unittest.TestCase):
+    def test_reentered_line_replaces(self):
+        output = self.execute('20 PRINT "B"', '10 PRINT "A"',
+                              '20 PRINT "C"', 'RUN')
+        self.assertEqual(output, 'A\nC\n')
+
+    def test_delete_line(self):
+        output = self.execute('10 PRINT "A"', '20 PRINT "B"', '10', 'RUN')
+        self.assertEqual(output, 'B\n')
+
+    def test_clear(self):
+        output = self.execute('10 PRINT "A"', 'CLEAR', 'RUN')
+        self.assertEqual(output, '')
+
+
+if __name__ == '__main__':
+    unittest.main()
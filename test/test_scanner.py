@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import random
+import unittest
+from pyTBasic import parser
+from pyTBasic.scanner import scan_arrays, scan_tokens
+
+
+class ScannerTest(unittest.TestCase):
+    def assertSameTokens(self, text):
+        self.assertEqual(list(scan_tokens(text)),
+                         list(parser.generate_tokens(text)), repr(text))
+        arrays = scan_arrays(text)
+        compact = parser.compact_tokens(text)
+        self.assertEqual((arrays.types, arrays.starts, arrays.ends),
+                         (compact.types, compact.starts, compact.ends),
+                         repr(text))
+
+    def test_statements(self):
+        for text in ('PRINT "The variable B is ", B',
+                     'PRINT ((4 + 2) / (7 + 5) - 2) * 3',
+                     'IF X+2 <> 2-2 THEN LET Y = 3',
+                     'IF A >< B THEN GOTO 10',
+                     'IF A<=B THEN IF A>=C THEN GOSUB 100',
+                     '10 INPUT A, B; C',
+                     'PRINTX GOTOGOSUBRETURNENDQUIT',
+                     '12.5 .5 1. 007',
+                     '10 PRINT 1\n20 END\n',
+                     ' \t\r\f\v\x1c\xa0  LIST',
+                     'PRINT "UNTERMINATED',
+                     'PRINT "A\nB"',
+                     'PRINT x # 1',
+                     'PRINT ٣٤ + 1٥',
+                     '',
+                     '   '):
+            self.assertSameTokens(text)
+
+    def test_random_text(self):
+        alphabet = ('ABEFGILNOPQRSTUXYZ0123456789.+-*/(),;<>="'
+                    ' \t\n\xa0٣#a')
+        rng = random.Random(2013)
+        for _ in range(2000):
+            text = ''.join(rng.choice(alphabet)
+                           for _ in range(rng.randrange(30)))
+            self.assertSameTokens(text)
+
+    def test_parser_tokenizer(self):
+        b_parser = parser.BasicParser(tokenizer=scan_arrays)
+        self.assertEqual(repr(b_parser.parse('10 IF A <> 2 THEN PRINT "X"')),
+                         repr(parser.BasicParser().parse(
+                             '10 IF A <> 2 THEN PRINT "X"')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+import asyncio
+import time
+import unittest
+from pyTBasic import server
+from pyTBasic.evaluator import Limits
+
+
+class ServerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = await server.start_server(port=0, slice_steps=100)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def connect(self, port=None):
+        reader, writer = await asyncio.open_connection('127.0.0.1',
+                                                       port or self.port)
+        self.addAsyncCleanup(self.close, writer)
+        await reader.readuntil(server.PROMPT.encode())
+        return reader, writer
+
+    async def close(self, writer):
+        writer.close()
+        await writer.wait_closed()
+
+    async def send(self, reader, writer, line, until=server.PROMPT):
+        'Send line and return the output up to the next prompt'
+        writer.write(line.encode() + b'\n')
+        return (await reader.readuntil(until.encode())).decode()
+
+    async def test_input_and_print(self):
+        reader, writer = await self.connect()
+        await self.send(reader, writer, '10 INPUT A, B')
+        await self.send(reader, writer, '20 PRINT "SUM ", A + B')
+        self.assertEqual(await self.send(reader, writer, 'RUN',
+                                         server.INPUT_PROMPT), '? ')
+        await self.send(reader, writer, '2', server.INPUT_PROMPT)
+        self.assertEqual(await self.send(reader, writer, '40'), 'SUM 42\n] ')
+
+    async def test_sessions_are_separate(self):
+        first = await self.connect()
+        second = await self.connect()
+        await self.send(*first, 'LET A = 1')
+        self.assertEqual(await self.send(*second, 'PRINT A'), '0\n] ')
+
+    async def test_busy_session_yields(self):
+        busy = await self.connect()
+        busy[1].write(b'10 GOTO 10\nRUN\n')
+        await busy[1].drain()
+        other = await self.connect()
+        await self.send(*other, '10 LET I = 0')
+        await self.send(*other, '20 LET I = I + 1')
+        await self.send(*other, '30 IF I < 1000 THEN GOTO 20')
+        await self.send(*other, '40 PRINT I')
+        output = await asyncio.wait_for(self.send(*other, 'RUN'), 10)
+        self.assertEqual(output, '1000\n] ')
+
+    async def test_time_limit_excludes_other_sessions(self):
+        limited = await server.start_server(port=0, slice_steps=100,
+                                            limits=Limits(max_time=0.2))
+        self.addAsyncCleanup(limited.wait_closed)
+        self.addCleanup(limited.close)
+        session = await self.connect(limited.sockets[0].getsockname()[1])
+        await self.send(*session, '10 LET I = 0')
+        await self.send(*session, '20 LET I = I + 1')
+        await self.send(*session, '30 IF I < 2000 THEN GOTO 20')
+        await self.send(*session, '40 PRINT I')
+
+        async def hog():
+            # Other work holding the event loop between the run's slices
+            for _ in range(200):
+                time.sleep(0.01)
+                await asyncio.sleep(0)
+
+        hogging = asyncio.ensure_future(hog())
+        output = await asyncio.wait_for(self.send(*session, 'RUN'), 10)
+        hogging.cancel()
+        self.assertEqual(output, '2000\n] ')
+
+    async def test_quit(self):
+        reader, writer = await self.connect()
+        await self.send(reader, writer, '10 PRINT "BYE"')
+        await self.send(reader, writer, '20 QUIT')
+        writer.write(b'RUN\n')
+        self.assertEqual(await asyncio.wait_for(reader.read(), 10),
+                         b'BYE\n')
+
+    async def test_errors(self):
+        reader, writer = await self.connect()
+        self.assertEqual(await self.send(reader, writer, 'GOTO 99'),
+                         'RUNTIME ERROR  Undefined line 99\n] ')
+        self.assertTrue((await self.send(reader, writer, 'PRINT )'))
+                        .startswith('SYNTAX ERROR'))
+        self.assertEqual(await self.send(reader, writer, 'PRINT 1/0'),
+                         'RUNTIME ERROR  Division by zero\n] ')
+        writer.write(b'PRINT \xff\n')
+        self.assertTrue((await reader.readuntil(server.PROMPT.encode()))
+                        .startswith(b'SYNTAX ERROR'))
+        deep = 'PRINT ' + '(' * 5000 + '1' + ')' * 5000
+        self.assertEqual(await self.send(reader, writer, deep),
+                         'RUNTIME ERROR  RecursionError: maximum recursion '
+                         'depth exceeded\n] ')
+        self.assertEqual(await self.send(reader, writer, 'PRINT 6 * 7'),
+                         '42\n] ')
+
+
+if __name__ == '__main__':
+    unittest.main()
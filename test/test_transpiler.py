@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+import unittest
+from pyTBasic.transpiler import PythonEvaluator
+from test import test_evaluator
+
+
+class PythonEvaluatorTest(test_evaluator.EvaluatorTest):
+    evaluator_class = PythonEvaluator
+
+    def test_source(self):
+        self.execute('10 LET I = 0',
+                     '20 LET I = I + 1',
+                     '30 IF I < 3 THEN GOTO 20',
+                     'RUN')
+        source = self.evaluator.source
+        self.assertIn('I = (I + 1)', source)
+        self.assertIn('def basic_program(pc', source)
+
+    def test_immediate_goto_into_block(self):
+        output = self.execute('10 PRINT "A"', '20 PRINT "B"',
+                              '30 PRINT "C"', 'GOTO 20')
+        self.assertEqual(output, 'B\nC\n')
+
+    def test_visitor_fallback(self):
+        output = self.execute('10 LET A = 5',
+                              '20 LIST',
+                              '30 PRINT A',
+                              'RUN')
+        self.assertEqual(output.splitlines()[-1], '5')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+
+import unittest
+from pyTBasic import vm
+from test import test_evaluator
+
+
+class VMEvaluatorTest(test_evaluator.EvaluatorTest):
+    evaluator_class = vm.VMEvaluator
+
+    def test_bytecode(self):
+        self.execute('10 LET I = I + 1', 'RUN')
+        self.assertEqual(list(self.evaluator.bytecode),
+                         [vm.LOAD, 8, vm.ADD_INT, 1,
+                          vm.STORE, 8, vm.END, 0])
+
+    def test_variables_written_back(self):
+        self.execute('10 LET Q = 41', '20 LET Q = Q + 1', 'RUN')
+        self.assertEqual(self.execute('PRINT Q'), '42\n')
+
+
+if __name__ == '__main__':
+    unittest.main()